@@ -0,0 +1 @@
+# Lets the tests import the application modules as the src package, like app.py does
@@ -1,13 +1,14 @@
 """Entry point for the SDI to NDI converter application"""
 import sys
-from PyQt6.QtWidgets import QApplication
-try:
-    from .main import MainWindow
-except ImportError:
-    from main import MainWindow
 
 def main():
     try:
+        from PyQt6.QtWidgets import QApplication
+        try:
+            from .main import MainWindow
+        except ImportError:
+            from main import MainWindow
+
         app = QApplication(sys.argv)
         window = MainWindow()
         window.show()
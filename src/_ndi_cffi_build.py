@@ -0,0 +1,52 @@
+"""Build step: compile the cffi (API mode) binding used for NDIOutput's per-frame send.
+
+Needs cffi, a C compiler and the NDI SDK headers. Run it on a machine with the SDK installed:
+    python src/_ndi_cffi_build.py
+The resulting _ndi_cffi extension is written next to this file; ndi_output.py falls back
+to ctypes when it is not there.
+"""
+import os
+from cffi import FFI
+
+try:
+    from .config import NDI_SDK_PATH
+except ImportError:
+    from config import NDI_SDK_PATH
+
+ffi = FFI()
+
+# From Processing.NDI.Lib.h; "..." lets the compiler work out the rest of the layout
+ffi.cdef("""
+    typedef void* NDIlib_send_instance_t;
+    typedef int... NDIlib_FourCC_video_type_e;
+    typedef int... NDIlib_frame_format_type_e;
+
+    typedef struct {
+        int xres;
+        int yres;
+        NDIlib_FourCC_video_type_e FourCC;
+        int frame_rate_N;
+        int frame_rate_D;
+        float picture_aspect_ratio;
+        NDIlib_frame_format_type_e frame_format_type;
+        int64_t timecode;
+        uint8_t* p_data;
+        int line_stride_in_bytes;
+        const char* p_metadata;
+        int64_t timestamp;
+        ...;
+    } NDIlib_video_frame_v2_t;
+
+    void NDIlib_send_send_video_v2(NDIlib_send_instance_t p_instance, const NDIlib_video_frame_v2_t* p_video_data);
+""")
+
+ffi.set_source(
+    "_ndi_cffi",
+    '#include "Processing.NDI.Lib.h"',
+    include_dirs=[os.path.join(NDI_SDK_PATH, "Include")],
+    library_dirs=[os.path.join(NDI_SDK_PATH, "Lib", "x64")],
+    libraries=["Processing.NDI.Lib.x64"],
+)
+
+if __name__ == "__main__":
+    ffi.compile(tmpdir=os.path.dirname(os.path.abspath(__file__)), verbose=True)
@@ -0,0 +1,186 @@
+/*
+ * UYVY (8-bit 4:2:2, bmdFormat8BitYUV) -> BGRA conversion with an AVX2 path.
+ *
+ * Loaded with ctypes by src/color_convert.py from lib/, next to the NDI runtime.
+ * Build:
+ *   gcc -O3 -fopenmp -shared -o lib/uyvy_simd.dll src/_uyvy_simd.c      (MinGW-w64)
+ *   cl /O2 /openmp /LD src\_uyvy_simd.c /Fe:lib\uyvy_simd.dll           (MSVC)
+ *
+ * Coefficients are BT.601 limited range in 6-bit fixed point, matching
+ * cv2.COLOR_YUV2BGRA_UYVY to within a couple of LSBs. The AVX2 path is
+ * selected at runtime, so the library also loads on CPUs without AVX2.
+ * With OpenMP, a frame is split into bands converted on several threads
+ * (uyvy_simd_set_threads; color_convert.py passes $SDI_NDI_THREADS).
+ */
+#include <stddef.h>
+#include <stdint.h>
+#include <immintrin.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+#ifdef _MSC_VER
+#include <intrin.h>
+#define EXPORT __declspec(dllexport)
+#define TARGET_AVX2
+#else
+#define EXPORT __attribute__((visibility("default")))
+#define TARGET_AVX2 __attribute__((target("avx2")))
+#endif
+
+/* Fixed-point (x64) coefficients: R = 1.164(Y-16) + 1.596(V-128), ... */
+#define CVR 102
+#define CUG 25
+#define CVG 52
+#define CUB 129
+
+static inline uint8_t clamp_u8(int v)
+{
+    return (uint8_t)(v < 0 ? 0 : (v > 255 ? 255 : v));
+}
+
+/* (Y - 16) * 74.5, clamped at zero like OpenCV */
+static inline int scale_luma(int y)
+{
+    y = y > 16 ? y - 16 : 0;
+    return 74 * y + (y >> 1) + 32; /* + rounding term for the final >> 6 */
+}
+
+static void uyvy_to_bgra_scalar(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    for (size_t i = 0; i + 1 < n_pixels; i += 2, src += 4, dst += 8) {
+        int u = src[0] - 128, v = src[2] - 128;
+        int r = CVR * v, g = -CUG * u - CVG * v, b = CUB * u;
+        int c0 = scale_luma(src[1]), c1 = scale_luma(src[3]);
+        dst[0] = clamp_u8((c0 + b) >> 6);
+        dst[1] = clamp_u8((c0 + g) >> 6);
+        dst[2] = clamp_u8((c0 + r) >> 6);
+        dst[3] = 255;
+        dst[4] = clamp_u8((c1 + b) >> 6);
+        dst[5] = clamp_u8((c1 + g) >> 6);
+        dst[6] = clamp_u8((c1 + r) >> 6);
+        dst[7] = 255;
+    }
+}
+
+/* 16 pixels (32 source bytes, 64 destination bytes) per iteration */
+TARGET_AVX2 static size_t uyvy_to_bgra_avx2(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    const __m256i low_bytes = _mm256_set1_epi16(0x00FF);
+    const __m256i dup_u = _mm256_setr_epi8(0, 1, 0, 1, 4, 5, 4, 5, 8, 9, 8, 9, 12, 13, 12, 13,
+                                           0, 1, 0, 1, 4, 5, 4, 5, 8, 9, 8, 9, 12, 13, 12, 13);
+    const __m256i dup_v = _mm256_setr_epi8(2, 3, 2, 3, 6, 7, 6, 7, 10, 11, 10, 11, 14, 15, 14, 15,
+                                           2, 3, 2, 3, 6, 7, 6, 7, 10, 11, 10, 11, 14, 15, 14, 15);
+    /* Interleave the two 8-byte halves of each lane: b0 g0 b1 g1 ... */
+    const __m256i zip = _mm256_setr_epi8(0, 8, 1, 9, 2, 10, 3, 11, 4, 12, 5, 13, 6, 14, 7, 15,
+                                         0, 8, 1, 9, 2, 10, 3, 11, 4, 12, 5, 13, 6, 14, 7, 15);
+    const __m256i c16 = _mm256_set1_epi16(16);
+    const __m256i c128 = _mm256_set1_epi16(128);
+    const __m256i round = _mm256_set1_epi16(32);
+    const __m256i alpha = _mm256_set1_epi16(255);
+    const __m256i zero = _mm256_setzero_si256();
+    size_t i = 0;
+
+    for (; i + 16 <= n_pixels; i += 16, src += 32, dst += 64) {
+        __m256i in = _mm256_loadu_si256((const __m256i *)src);
+        __m256i y = _mm256_srli_epi16(in, 8);
+        __m256i uv = _mm256_sub_epi16(_mm256_and_si256(in, low_bytes), c128);
+        __m256i u = _mm256_shuffle_epi8(uv, dup_u);
+        __m256i v = _mm256_shuffle_epi8(uv, dup_v);
+
+        y = _mm256_max_epi16(_mm256_sub_epi16(y, c16), zero);
+        y = _mm256_add_epi16(_mm256_add_epi16(_mm256_mullo_epi16(y, _mm256_set1_epi16(74)),
+                                              _mm256_srli_epi16(y, 1)), round);
+
+        /* Saturating adds: anything that saturates is far outside 0..255 anyway */
+        __m256i r = _mm256_adds_epi16(y, _mm256_mullo_epi16(v, _mm256_set1_epi16(CVR)));
+        __m256i g = _mm256_subs_epi16(_mm256_subs_epi16(y, _mm256_mullo_epi16(u, _mm256_set1_epi16(CUG))),
+                                      _mm256_mullo_epi16(v, _mm256_set1_epi16(CVG)));
+        __m256i b = _mm256_adds_epi16(y, _mm256_mullo_epi16(u, _mm256_set1_epi16(CUB)));
+        r = _mm256_srai_epi16(r, 6);
+        g = _mm256_srai_epi16(g, 6);
+        b = _mm256_srai_epi16(b, 6);
+
+        /* Per 128-bit lane: bg = b0..b7 g0..g7, ra = r0..r7 a0..a7 -> zipped byte pairs */
+        __m256i bg = _mm256_shuffle_epi8(_mm256_packus_epi16(b, g), zip);
+        __m256i ra = _mm256_shuffle_epi8(_mm256_packus_epi16(r, alpha), zip);
+        __m256i lo = _mm256_unpacklo_epi16(bg, ra); /* pixels 0-3 | 8-11 */
+        __m256i hi = _mm256_unpackhi_epi16(bg, ra); /* pixels 4-7 | 12-15 */
+        _mm256_storeu_si256((__m256i *)dst, _mm256_permute2x128_si256(lo, hi, 0x20));
+        _mm256_storeu_si256((__m256i *)(dst + 32), _mm256_permute2x128_si256(lo, hi, 0x31));
+    }
+    return i;
+}
+
+static int detect_avx2(void)
+{
+#ifdef _MSC_VER
+    int info[4];
+    __cpuid(info, 0);
+    if (info[0] < 7)
+        return 0;
+    __cpuid(info, 1);
+    /* OSXSAVE + AVX, and the OS must save YMM state */
+    if ((info[2] & (1 << 27)) == 0 || (info[2] & (1 << 28)) == 0)
+        return 0;
+    if ((_xgetbv(0) & 0x6) != 0x6)
+        return 0;
+    __cpuidex(info, 7, 0);
+    return (info[1] & (1 << 5)) != 0;
+#else
+    return __builtin_cpu_supports("avx2");
+#endif
+}
+
+static int has_avx2 = -1;
+
+EXPORT int uyvy_simd_has_avx2(void)
+{
+    if (has_avx2 < 0)
+        has_avx2 = detect_avx2() != 0;
+    return has_avx2;
+}
+
+static void uyvy_to_bgra_band(const uint8_t *src, uint8_t *dst, size_t n_pixels, int avx2)
+{
+    size_t done = 0;
+    if (avx2)
+        done = uyvy_to_bgra_avx2(src, dst, n_pixels);
+    uyvy_to_bgra_scalar(src + done * 2, dst + done * 4, n_pixels - done);
+}
+
+/* Pixels per band: a multiple of 16 (whole AVX2 iterations), 64 KiB of BGRA */
+#define BAND_PIXELS 16384
+
+#ifdef _OPENMP
+static int num_threads = 0; /* 0: OpenMP's default */
+#endif
+
+/* Set the number of conversion threads (0 = default); returns the number that will be used */
+EXPORT int uyvy_simd_set_threads(int n)
+{
+#ifdef _OPENMP
+    num_threads = n > 0 ? n : 0;
+    return num_threads ? num_threads : omp_get_max_threads();
+#else
+    (void)n;
+    return 1;
+#endif
+}
+
+EXPORT void uyvy_to_bgra(const uint8_t *src, uint8_t *dst, size_t n_pixels)
+{
+    int avx2 = uyvy_simd_has_avx2();
+    int n_bands = (int)((n_pixels + BAND_PIXELS - 1) / BAND_PIXELS);
+#ifdef _OPENMP
+    int threads = num_threads ? num_threads : omp_get_max_threads();
+
+    /* Bands are disjoint, so threads never write the same cache line */
+#pragma omp parallel for schedule(static) num_threads(threads) if (n_bands > 1 && threads > 1)
+#endif
+    for (int k = 0; k < n_bands; k++) {
+        size_t start = (size_t)k * BAND_PIXELS;
+        size_t count = n_pixels - start < BAND_PIXELS ? n_pixels - start : BAND_PIXELS;
+        uyvy_to_bgra_band(src + start * 2, dst + start * 4, count, avx2);
+    }
+}
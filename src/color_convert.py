@@ -0,0 +1,45 @@
+"""UYVY -> BGRA colour conversion, using the AVX2 library from lib/ when it is available"""
+import os
+import ctypes
+import logging
+import cv2
+import numpy as np
+
+# Built from src/_uyvy_simd.c (see the build notes at the top of that file)
+SIMD_LIB_NAMES = ("uyvy_simd.dll", "libuyvy_simd.so")
+SIMD_LIB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lib")
+SIMD_THREADS_ENV = "SDI_NDI_THREADS"
+
+_simd = None
+for _name in SIMD_LIB_NAMES:
+    _path = os.path.join(SIMD_LIB_DIR, _name)
+    if not os.path.exists(_path):
+        continue
+    try:
+        _simd = ctypes.CDLL(_path)
+        _simd.uyvy_to_bgra.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+        _simd.uyvy_to_bgra.restype = None
+        _simd.uyvy_simd_has_avx2.argtypes = []
+        _simd.uyvy_simd_has_avx2.restype = ctypes.c_int
+        _simd.uyvy_simd_set_threads.argtypes = [ctypes.c_int]
+        _simd.uyvy_simd_set_threads.restype = ctypes.c_int
+        # Conversion threads (OpenMP builds only); unset or 0 leaves OpenMP's default
+        _threads = _simd.uyvy_simd_set_threads(int(os.environ.get(SIMD_THREADS_ENV, "0") or 0))
+        logging.info(f"Loaded {_path} (AVX2: {bool(_simd.uyvy_simd_has_avx2())}, threads: {_threads})")
+        break
+    except (OSError, AttributeError, ValueError) as e:
+        logging.error(f"Error loading {_path}: {e}")
+        _simd = None
+
+HAVE_SIMD = _simd is not None
+
+def uyvy_to_bgra(src, dst=None):
+    """Convert a (H, W, 2) UYVY frame to (H, W, 4) BGRA, writing into dst if given"""
+    height, width = src.shape[:2]
+    if dst is None:
+        dst = np.empty((height, width, 4), dtype=np.uint8)
+    if _simd is not None and src.flags['C_CONTIGUOUS'] and dst.flags['C_CONTIGUOUS']:
+        _simd.uyvy_to_bgra(src.ctypes.data, dst.ctypes.data, height * width)
+        return dst
+    # OpenCV's own conversion is SIMD-optimized too; used when the library isn't built
+    return cv2.cvtColor(src, cv2.COLOR_YUV2BGRA_UYVY, dst=dst)
@@ -1,32 +1,176 @@
 import os
 import sys
-import comtypes
+import logging
+import hashlib
+import importlib
+import importlib.util
+import threading
+import shutil
+import compileall
+from typing import Final
 
 # SDK Paths
 DECKLINK_SDK_PATH = r"D:\Program Files\SDI\Blackmagic DeckLink SDK 14.4"
 NDI_SDK_PATH = r"C:\Program Files\NDI\NDI 6 SDK"
 NDI_LIB_PATH = os.path.join(NDI_SDK_PATH, "Lib", "x64", "Processing.NDI.Lib.x64.lib")
 
-# DeckLink interface identifiers
-DECKLINK_IID = {
-    'IDeckLink': comtypes.GUID("{C418FBDD-0587-48ED-8FE5-640F0A14AF91}"),
-    'IDeckLinkInput': comtypes.GUID("{89C2E016-C7AB-4062-B33C-32BF40A3BF76}"),
-    'IDeckLinkOutput': comtypes.GUID("{CC5B7940-838F-4E32-8D0C-352861509567}"), # Added IDeckLinkOutput
-    'IDeckLinkVideoInputFrame': comtypes.GUID("{6F1EE085-F441-4E04-A839-F7B35861744A}")
+# DeckLink interface identifiers. Kept as strings: the comtypes.GUID objects are
+# built on first access (module __getattr__ below), so NDI-only sessions never
+# import comtypes
+_DECKLINK_IIDS: Final = {
+    "IID_IDeckLink": "{C418FBDD-0587-48ED-8FE5-640F0A14AF91}",
+    "IID_IDeckLinkInput": "{89C2E016-C7AB-4062-B33C-32BF40A3BF76}",
+    "IID_IDeckLinkOutput": "{CC5B7940-838F-4E32-8D0C-352861509567}",
+    "IID_IDeckLinkVideoInputFrame": "{6F1EE085-F441-4E04-A839-F7B35861744A}",
 }
 
-# Video mode constants (from DeckLinkAPI_h.h)
-DECKLINK_MODE = {
-    'bmdModeHD1080p60': 0x6000000000000017,
-    'bmdModeHD1080p59_94': 0x6000000000000016,
-    'bmdModeHD1080p50': 0x6000000000000015,
-    'bmdFormat8BitYUV': 0x32595559,  # '2YUY' in hex
-    'bmdVideoInputFlagDefault': 0x00000000,
-    'width': 1920,
-    'height': 1080
-}
+# Video mode constants (from DeckLinkAPI_h.h; four-character codes)
+bmdModeHD1080p60: Final[int] = 0x48703630  # 'Hp60'
+bmdModeHD1080p59_94: Final[int] = 0x48703539  # 'Hp59'
+bmdModeHD1080p50: Final[int] = 0x48703530  # 'Hp50'
+bmdFormat8BitYUV: Final[int] = 0x32767579  # '2vuy': 8-bit 4:2:2 in UYVY byte order (Cb Y0 Cr Y1)
+bmdVideoInputFlagDefault: Final[int] = 0x00000000
+bmdVideoOutputFlagDefault: Final[int] = 0x00000000
+bmdFrameFlagDefault: Final[int] = 0x00000000
+# bmdModeHD1080p60 timing (IDeckLinkDisplayMode::GetFrameRate): 1000/60000 s per frame
+DECKLINK_FRAME_DURATION: Final[int] = 1000
+DECKLINK_TIME_SCALE: Final[int] = 60000
+DECKLINK_WIDTH: Final[int] = 1920
+DECKLINK_HEIGHT: Final[int] = 1080
+DECKLINK_FRAME_SHAPE: Final = (DECKLINK_HEIGHT, DECKLINK_WIDTH, 2) # One bmdFormat8BitYUV frame as a numpy array
+DECKLINK_ROW_BYTES: Final[int] = DECKLINK_WIDTH * 2
+DECKLINK_FRAME_BYTES: Final[int] = DECKLINK_ROW_BYTES * DECKLINK_HEIGHT
 
 # NDI configuration
 NDI_OUTPUT_NAME = "SDI-NDI Converter"
 NDI_INPUT_NAME = "NDI-SDI Converter Input" # Default name for NDI receiver
-NDI_FRAME_RATE = 60000/1001  # 59.94 fps
+NDI_FRAME_RATE_N = 60000
+NDI_FRAME_RATE_D = 1001
+NDI_FRAME_RATE = NDI_FRAME_RATE_N/NDI_FRAME_RATE_D  # 59.94 fps
+# FourCC for native 4:2:2 frames; matches bmdFormat8BitYUV so SDI frames pass through unconverted
+NDI_FOURCC = 'UYVY'
+# Outputs are paced by the incoming frames: NDI send must not block on its own video clock
+NDI_CLOCK_VIDEO = False
+NDI_CLOCK_AUDIO = True
+NDI_SOURCES_CACHE_TTL = 3.0 # Seconds a discovered NDI source list is reused
+NDI_CAPTURE_TIMEOUT_MS = 33 # Longest an NDI receive call blocks before re-checking for stop
+# CPU affinity mask for NDI receive threads on Windows, e.g. 0x4 for core 2 (a
+# performance core on hybrid CPUs); None leaves placement to the scheduler
+NDI_RECEIVE_THREAD_AFFINITY = None
+
+# Number of preallocated buffers each input cycles through for converted frames
+FRAME_RING_SLOTS = 4
+# Frames SDI output may have queued for playback before new ones are dropped (bounds latency)
+SDI_OUTPUT_MAX_BUFFERED_FRAMES = 3
+
+# DeckLink COM wrapper generation (deferred until a DeckLink backend is created)
+DECKLINK_TLB_PATH = os.path.join(DECKLINK_SDK_PATH, "Win", "DeckLinkAPI.tlb")
+DECKLINK_WRAPPER_MODULE = "comtypes.gen.DeckLinkAPI"
+DECKLINK_WRAPPER_STAMP = "DeckLinkAPI.tlbhash" # Sidecar next to the generated wrapper
+# Prebuilt wrapper shipped with the app (see freeze_decklink_module); used before comtypes.gen
+DECKLINK_FROZEN_WRAPPER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lib", "decklink_gen")
+_decklink_module = None
+_decklink_module_attempted = False
+_decklink_module_lock = threading.Lock() # May be loaded from a background thread at startup
+
+def _tlb_digest(tlb_path):
+    """Short content hash of the type library, used to key the generated wrapper"""
+    with open(tlb_path, 'rb') as f:
+        return hashlib.blake2b(f.read()).hexdigest()[:16]
+
+def _read_stamp(stamp_path):
+    try:
+        with open(stamp_path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _load_frozen_decklink_module():
+    """Import the wrapper shipped in DECKLINK_FROZEN_WRAPPER_DIR, or return None if there is none.
+
+    The directory is put on comtypes.gen's package path, so the generated modules
+    import each other under their usual comtypes.gen names. When the SDK's type
+    library is present and differs from the one the wrapper was built from, the
+    shipped wrapper is ignored and a live one is generated instead.
+    """
+    frozen_stamp = _read_stamp(os.path.join(DECKLINK_FROZEN_WRAPPER_DIR, DECKLINK_WRAPPER_STAMP))
+    if frozen_stamp is None:
+        return None
+    if os.path.exists(DECKLINK_TLB_PATH) and _tlb_digest(DECKLINK_TLB_PATH) != frozen_stamp:
+        logging.info("Shipped DeckLinkAPI wrapper does not match the installed SDK; ignoring it.")
+        return None
+    import comtypes.gen
+    if DECKLINK_FROZEN_WRAPPER_DIR not in comtypes.gen.__path__:
+        comtypes.gen.__path__.insert(0, DECKLINK_FROZEN_WRAPPER_DIR)
+    logging.info("Using shipped DeckLinkAPI wrapper module.")
+    return importlib.import_module(DECKLINK_WRAPPER_MODULE)
+
+def freeze_decklink_module(target_dir=DECKLINK_FROZEN_WRAPPER_DIR):
+    """Build step: generate the DeckLink wrapper and copy it, byte-compiled, into target_dir.
+
+    Every generated comtypes.gen module loaded by then (the DeckLinkAPI wrapper and
+    the type libraries it references, such as stdole) is copied. Run it on a machine
+    with the SDK installed before packaging:
+        python -c "from src.config import freeze_decklink_module; freeze_decklink_module()"
+    """
+    import comtypes.client
+    comtypes.client.GetModule(DECKLINK_TLB_PATH)
+    os.makedirs(target_dir, exist_ok=True)
+    for name, module in list(sys.modules.items()):
+        source = getattr(module, '__file__', None)
+        if name.startswith("comtypes.gen.") and source:
+            shutil.copy2(source, os.path.join(target_dir, os.path.basename(source)))
+    with open(os.path.join(target_dir, DECKLINK_WRAPPER_STAMP), 'w') as f:
+        f.write(_tlb_digest(DECKLINK_TLB_PATH))
+    if not compileall.compile_dir(target_dir, quiet=1):
+        raise RuntimeError(f"Failed to byte-compile the DeckLinkAPI wrapper in {target_dir}")
+    return target_dir
+
+def load_decklink_module():
+    """Import the comtypes DeckLink wrapper, only regenerating it when DeckLinkAPI.tlb changed"""
+    module = _load_frozen_decklink_module()
+    if module is not None:
+        return module
+
+    import comtypes.gen
+    digest = _tlb_digest(DECKLINK_TLB_PATH)
+    stamp_path = os.path.join(comtypes.gen.__path__[0], DECKLINK_WRAPPER_STAMP)
+    cached_digest = _read_stamp(stamp_path)
+
+    if cached_digest == digest and importlib.util.find_spec(DECKLINK_WRAPPER_MODULE) is not None:
+        logging.info("Using cached DeckLinkAPI wrapper module.")
+        return importlib.import_module(DECKLINK_WRAPPER_MODULE)
+
+    # Cache miss: parse the type library and generate the wrapper
+    import comtypes.client
+    module = comtypes.client.GetModule(DECKLINK_TLB_PATH)
+    importlib.invalidate_caches() # Make the freshly written comtypes.gen files visible to finders
+    try:
+        with open(stamp_path, 'w') as f:
+            f.write(digest)
+    except OSError as e:
+        logging.warning(f"Could not write DeckLinkAPI wrapper stamp {stamp_path}: {e}")
+    return module
+
+def ensure_decklink_module():
+    """Load the comtypes DeckLink wrapper on first use; returns None if unavailable"""
+    global _decklink_module, _decklink_module_attempted
+    with _decklink_module_lock:
+        if not _decklink_module_attempted:
+            _decklink_module_attempted = True
+            try:
+                _decklink_module = load_decklink_module()
+                logging.info("DeckLinkAPI type library loaded/generated successfully.")
+            except Exception as e:
+                # Do not abort here, let the DeckLink backends report their own init errors
+                logging.error(f"Error loading DeckLinkAPI type library: {e}")
+    return _decklink_module
+
+def __getattr__(name):
+    """Build the DeckLink IIDs as comtypes.GUIDs when the SDI backends first import them (PEP 562)"""
+    if name in _DECKLINK_IIDS:
+        import comtypes
+        guid = comtypes.GUID(_DECKLINK_IIDS[name])
+        globals()[name] = guid
+        return guid
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,38 @@
+import numpy as np
+
+# Frame buffers start on a cache line, so the SIMD kernels' stores never split
+# one. Rows are not padded: at 1080p, UYVY (3840 B) and BGRA (7680 B) rows are
+# already multiples of 64, and packed rows keep the buffers C-contiguous
+FRAME_ALIGNMENT = 64
+
+def aligned_empty(shape, dtype=np.uint8, alignment=FRAME_ALIGNMENT):
+    """np.empty whose data starts on an `alignment`-byte boundary"""
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    raw = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = -raw.ctypes.data % alignment
+    return raw[offset:offset + nbytes].view(dtype).reshape(shape)
+
+class FrameRing:
+    """Fixed set of preallocated frame buffers handed out round-robin.
+
+    A buffer is overwritten again after `slots` further frames, so consumers
+    that keep a frame longer than that must copy it.
+    """
+
+    __slots__ = ('slots', '_buffers', '_index') # next() runs once per frame
+
+    def __init__(self, slots=4):
+        self.slots = slots
+        self._buffers = [None] * slots
+        self._index = 0
+
+    def next(self, shape, dtype=np.uint8):
+        """Return the next buffer, (re)allocating it only if the frame geometry changed"""
+        index = self._index
+        self._index = (index + 1) % self.slots
+        buffer = self._buffers[index]
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = aligned_empty(shape, dtype)
+            self._buffers[index] = buffer
+        return buffer
@@ -0,0 +1,93 @@
+"""Measure the per-frame conversion kernels against a memcpy of the same frame.
+
+Each kernel's effective bandwidth (bytes read + written per second) is compared
+with a single-threaded copy: close to memcpy speed means the step is memory-bound
+and only fusion or zero-copy can help, far below it means it is compute-bound and
+worth SIMD work. Run it on the target machine:
+    python -m src.kernel_profile
+or set SDI_NDI_PROFILE=1 to log the same report once at startup.
+"""
+import time
+import logging
+import cv2
+import numpy as np
+
+try:
+    from .config import DECKLINK_WIDTH, DECKLINK_HEIGHT
+    from .color_convert import uyvy_to_bgra, HAVE_SIMD
+    from .frame_ring import aligned_empty
+    from .preview_kernels import uyvy_to_rgb_downscale
+except ImportError:
+    from config import DECKLINK_WIDTH, DECKLINK_HEIGHT
+    from color_convert import uyvy_to_bgra, HAVE_SIMD
+    from frame_ring import aligned_empty
+    from preview_kernels import uyvy_to_rgb_downscale
+
+PROFILE_ENV = "SDI_NDI_PROFILE"
+PROFILE_FRAMES = 120
+# Fractions of memcpy bandwidth above/below which a step counts as memory/compute-bound
+MEMORY_BOUND_RATIO = 0.7
+COMPUTE_BOUND_RATIO = 0.3
+
+def _time_per_frame(kernel, frames):
+    kernel() # Warm up caches, lazy imports and JIT compilation
+    start = time.perf_counter_ns()
+    for _ in range(frames):
+        kernel()
+    return (time.perf_counter_ns() - start) / frames
+
+def _classify(ratio):
+    if ratio >= MEMORY_BOUND_RATIO:
+        return "memory-bound"
+    if ratio < COMPUTE_BOUND_RATIO:
+        return "compute-bound"
+    return "mixed"
+
+def profile_kernels(frames=PROFILE_FRAMES, width=DECKLINK_WIDTH, height=DECKLINK_HEIGHT):
+    """Time each conversion over `frames` frames; returns (name, ms per frame, GB/s, share of memcpy GB/s, class) rows"""
+    rng = np.random.default_rng(0)
+    uyvy = aligned_empty((height, width, 2))
+    uyvy[...] = rng.integers(0, 256, uyvy.shape, dtype=np.uint8)
+    bgra = uyvy_to_bgra(uyvy, aligned_empty((height, width, 4)))
+    bgr = np.ascontiguousarray(bgra[..., :3])
+    uyvy_dst = aligned_empty(uyvy.shape)
+    bgra_dst = aligned_empty(bgra.shape)
+    preview = np.empty((height // 3, width // 3, 3), dtype=np.uint8)
+
+    # (name, kernel, bytes read + written per frame)
+    steps = [
+        ("UYVY->BGRA (" + ("SIMD library" if HAVE_SIMD else "OpenCV") + ")",
+         lambda: uyvy_to_bgra(uyvy, bgra_dst), uyvy.nbytes + bgra.nbytes),
+        ("BGR->BGRA (NDI output)", lambda: cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA, dst=bgra_dst), bgr.nbytes + bgra.nbytes),
+        ("BGR->UYVY (SDI output)", lambda: cv2.cvtColor(bgr, cv2.COLOR_BGR2YUV_UYVY, dst=uyvy_dst), bgr.nbytes + uyvy.nbytes),
+        ("BGRA->UYVY (SDI output)", lambda: cv2.cvtColor(bgra, cv2.COLOR_BGRA2YUV_UYVY, dst=uyvy_dst), bgra.nbytes + uyvy.nbytes),
+        ("UYVY copy (SDI output, capture inbox)", lambda: np.copyto(uyvy_dst, uyvy), 2 * uyvy.nbytes),
+        ("UYVY->RGB 1/3 preview", lambda: uyvy_to_rgb_downscale(uyvy, preview, 3), uyvy.nbytes // 3 + preview.nbytes),
+    ]
+
+    memcpy_ns = _time_per_frame(lambda: np.copyto(bgra_dst, bgra), frames)
+    memcpy_gbps = 2 * bgra.nbytes / memcpy_ns
+    results = [("memcpy baseline", memcpy_ns / 1e6, memcpy_gbps, 1.0, "-")]
+    for name, kernel, nbytes in steps:
+        ns = _time_per_frame(kernel, frames)
+        gbps = nbytes / ns
+        ratio = gbps / memcpy_gbps
+        results.append((name, ns / 1e6, gbps, ratio, _classify(ratio)))
+    return results
+
+def format_report(results):
+    lines = [f"{'step':40s} {'ms/frame':>9s} {'GB/s':>7s} {'memcpy':>7s}  class"]
+    for name, ms, gbps, ratio, label in results:
+        lines.append(f"{name:40s} {ms:9.2f} {gbps:7.2f} {ratio:7.0%}  {label}")
+    return "\n".join(lines)
+
+def log_kernel_profile():
+    """Profile the kernels and log the report (for the startup hook; runs in the caller's thread)"""
+    try:
+        report = format_report(profile_kernels())
+        logging.info(f"Frame kernel profile:\n{report}")
+    except Exception as e:
+        logging.error(f"Frame kernel profiling failed: {e}")
+
+if __name__ == "__main__":
+    print(format_report(profile_kernels()))
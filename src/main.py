@@ -1,18 +1,159 @@
+import os
 import sys
+import atexit
+import queue
 import logging
+import logging.handlers
 import traceback
+import importlib
+import threading
+from collections import OrderedDict
+import numpy as np
 from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QFrame
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, QStringListModel, QSignalBlocker, pyqtSignal
 
-# Configure logging
-logging.basicConfig(filename='app_errors.log', level=logging.INFO, 
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+# Configure logging: log calls only enqueue the record, and a listener thread
+# does the formatting and file writes (errors only, to keep the disk quiet)
+_log_queue = queue.Queue(-1)
+_log_file_handler = logging.FileHandler('app_errors.log')
+_log_file_handler.setLevel(logging.ERROR)
+_log_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler, respect_handler_level=True)
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s')) # The file handler adds the prefix
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler])
+_log_listener.start()
+
+def stop_logging():
+    """Flush queued log records to disk and stop the listener thread"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+        _log_file_handler.close()
+
+atexit.register(stop_logging)
 
 from .preview_widget import PreviewWidget
-from .sdi_capture import SDICapture
-from .ndi_output import NDIOutput
-from .ndi_input import NDIInput, ndi_lib
-from .sdi_output import SDIOutput
+
+# Capture/output backends pull in comtypes, OpenCV and the NDI DLL, so they are
+# only imported when first referenced (PEP 562 module __getattr__)
+_LAZY_BACKENDS = {
+    'SDICapture': '.sdi_capture',
+    'SDIOutput': '.sdi_output',
+    'NDIOutput': '.ndi_output',
+    'NDIInput': '.ndi_input',
+    'ndi_lib': '.ndi_input',
+}
+
+def __getattr__(name):
+    """Import a backend module the first time one of its names is accessed"""
+    module_name = _LAZY_BACKENDS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __package__), name)
+    globals()[name] = value
+    return value
+
+# Placeholder entries shown in the NDI source selector instead of a real source
+NDI_SEARCHING_TEXT = "Searching for NDI sources..."
+NDI_NO_SOURCES_TEXT = "No NDI sources found"
+_NDI_PLACEHOLDERS = {NDI_SEARCHING_TEXT, NDI_NO_SOURCES_TEXT, "NDI library not loaded",
+                     "NDI initialization failed", "Error listing sources"}
+
+# Longest time NDI discovery waits for the startup preload to initialize NDI
+NDI_PRELOAD_TIMEOUT = 10.0
+SOURCE_PREVIEW_POOL_SIZE = 4 # Paused preview inputs kept open for quick reuse
+
+class _DiscoverySignals(QObject):
+    finished = pyqtSignal(list)
+    failed = pyqtSignal(str, str) # error message, selector placeholder
+
+class _SourceDiscovery(QRunnable):
+    """Runs NDI source discovery on the global thread pool"""
+
+    def __init__(self, ndi_ready):
+        super().__init__()
+        self.ndi_ready = ndi_ready
+        self.signals = _DiscoverySignals()
+
+    def run(self):
+        try:
+            # Let the startup preload finish loading/initializing NDI first
+            self.ndi_ready.wait(NDI_PRELOAD_TIMEOUT)
+            from .ndi_input import NDIInput, ndi_lib
+            # Ensure NDI is initialized
+            if not ndi_lib:
+                self.signals.failed.emit("NDI library not loaded", "NDI library not loaded")
+                return
+
+            logging.info("Initializing NDI...")
+            if not ndi_lib.NDIlib_initialize():
+                self.signals.failed.emit("Failed to initialize NDI", "NDI initialization failed")
+                return
+            logging.info("NDI initialized successfully")
+
+            logging.info("Listing NDI sources...")
+            self.signals.finished.emit(NDIInput.list_sources())
+        except Exception as e:
+            self.signals.failed.emit(f"Error listing NDI sources: {e}", "Error listing sources")
+
+class _PreviewThrottle(QObject):
+    """Feeds a PreviewWidget at a fixed rate with only the newest frame it was given"""
+
+    def __init__(self, widget, interval_ms=66, parent=None):
+        super().__init__(parent)
+        self.widget = widget
+        self._latest = None
+        # Two private frame copies: the one the widget is showing (its QImage may wrap
+        # it) and the one the capture thread fills next; they swap on hand-off
+        self._buffers = [None, None]
+        self._fill = 0 # Index of the buffer set_latest writes
+        self._wanted = True # Set by the timer once the previous frame has been painted
+        self._lock = threading.Lock() # Makes publishing and taking a frame atomic w.r.t. _wanted
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def set_latest(self, frame):
+        """Copy the frame if a repaint is due; safe to call from the capture thread via DirectConnection.
+
+        Input buffers may be reused or freed as soon as the emit returns, so the
+        frame is copied, but only once per repaint interval.
+        """
+        if not self._wanted:
+            return
+        buffer = self._buffers[self._fill]
+        if buffer is None or buffer.shape != frame.shape or buffer.dtype != frame.dtype:
+            buffer = np.empty(frame.shape, dtype=frame.dtype)
+            self._buffers[self._fill] = buffer
+        np.copyto(buffer, frame)
+        # The timer only re-arms after taking a published frame, so it can neither
+        # re-arm while this buffer waits to be shown nor miss the disarm
+        with self._lock:
+            self._latest = buffer
+            self._wanted = False
+
+    def start(self):
+        self._wanted = True
+        self._timer.start()
+
+    def stop(self):
+        """Stop repainting and drop the held frame reference"""
+        self._timer.stop()
+        self._latest = None
+
+    def _on_timeout(self):
+        with self._lock:
+            frame = self._latest
+            if frame is None:
+                return
+            self._latest = None
+        self.widget.update_frame(frame)
+        # The widget now shows this buffer, so the next frame goes into the other one
+        with self._lock:
+            self._fill ^= 1
+            self._wanted = True
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -63,6 +204,8 @@ class MainWindow(QMainWindow):
         
         # NDI Source selection (initially hidden)
         self.ndi_source_selector = QComboBox()
+        self._sources_model = QStringListModel()
+        self.ndi_source_selector.setModel(self._sources_model)
         self.ndi_source_selector.hide() # Hide by default
         io_layout.addWidget(self.ndi_source_selector)
         # Add Preview button for source preview
@@ -103,6 +246,13 @@ class MainWindow(QMainWindow):
         # Initialize capture and output objects (will be instantiated dynamically)
         self.current_input = None
         self.current_output = None
+        self._frame_connections = [] # (signal, QMetaObject.Connection) made by start_conversion
+        self._source_preview_pool = OrderedDict() # (input type, source name) -> paused preview input, LRU order
+
+        # Both previews repaint at ~15 Hz from the newest frame rather than on
+        # every incoming frame
+        self._source_preview_throttle = _PreviewThrottle(self.source_preview, parent=self)
+        self._preview_throttle = _PreviewThrottle(self.preview, parent=self)
         
         # Initialize all possible input/output modules
         self.sdi_capture = None
@@ -110,8 +260,65 @@ class MainWindow(QMainWindow):
         self.ndi_output = None
         self.sdi_output = None
 
+        # Load the NDI library and the DeckLink COM wrapper in parallel while
+        # the window is being shown
+        self._ndi_ready = threading.Event()
+        threading.Thread(target=self._preload_ndi, name="NDI preload", daemon=True).start()
+        threading.Thread(target=self._preload_decklink, name="DeckLink preload", daemon=True).start()
+        threading.Thread(target=self._preload_preview_kernels, name="Preview kernel preload", daemon=True).start()
+
+        # Load the backends once the window has been shown so the first paint
+        # is not held up by comtypes/NDI/DeckLink initialization
+        self.start_button.setEnabled(False)
+        self.status_label.setText("Loading...")
+        QTimer.singleShot(0, self._initialize_backends)
+
+    def _preload_ndi(self):
+        """Load the NDI library and call NDIlib_initialize off the GUI thread"""
+        try:
+            from .ndi_input import ndi_lib
+            if ndi_lib and ndi_lib.NDIlib_initialize():
+                logging.info("NDI initialized successfully (preload)")
+            else:
+                logging.error("NDI preload failed: library not loaded or NDIlib_initialize() failed")
+        except Exception as e:
+            logging.error(f"NDI preload failed: {e}\n{traceback.format_exc()}")
+        finally:
+            self._ndi_ready.set()
+
+    def _preload_decklink(self):
+        """Generate/load the DeckLink COM wrapper off the GUI thread"""
+        try:
+            import comtypes
+            from .config import ensure_decklink_module
+            comtypes.CoInitialize()
+            try:
+                ensure_decklink_module()
+            finally:
+                comtypes.CoUninitialize()
+        except Exception as e:
+            logging.error(f"DeckLink preload failed: {e}\n{traceback.format_exc()}")
+
+    def _preload_preview_kernels(self):
+        """Import and JIT-compile the preview kernels so the first frame doesn't pay for it"""
+        try:
+            from .preview_kernels import warm_up
+            warm_up()
+            if os.environ.get("SDI_NDI_PROFILE"):
+                # Opt-in: measure the frame kernels against memcpy (see kernel_profile.py)
+                from .kernel_profile import log_kernel_profile
+                log_kernel_profile()
+        except Exception as e:
+            logging.error(f"Preview kernel preload failed: {e}\n{traceback.format_exc()}")
+
+    def _initialize_backends(self):
+        """Deferred part of window construction: create modules and wire the input selector"""
+        self.status_label.setText("Ready")
+        self.start_button.setEnabled(True)
         self._initialize_modules() # This will now only initialize SDI and NDIOutput
         self._connect_signals()
+        # Pre-warm the NDI source cache so the first switch to NDI input is instant
+        self._discover_ndi_sources()
 
         # Connect input selector signal after all widgets are initialized
         self.input_selector.currentIndexChanged.connect(self._on_input_type_changed)
@@ -121,6 +328,9 @@ class MainWindow(QMainWindow):
     def _initialize_modules(self):
         """Initialize all input/output modules that are not dynamically created"""
         try:
+            from .sdi_capture import SDICapture
+            from .ndi_output import NDIOutput
+            from .sdi_output import SDIOutput
             self.sdi_capture = SDICapture()
             # NDIInput will be initialized dynamically in start_conversion
             self.ndi_input = None 
@@ -148,44 +358,13 @@ class MainWindow(QMainWindow):
         # Stop any running source preview
         self._stop_source_preview()
         if input_type == "NDI Input":
-            self.ndi_source_selector.clear()
-            try:
-                # Ensure NDI is initialized
-                if not ndi_lib:
-                    self.handle_error("NDI library not loaded")
-                    self.ndi_source_selector.addItem("NDI library not loaded")
-                    self.ndi_source_selector.show()
-                    self.preview_button.show()
-                    return
-
-                logging.info("Initializing NDI...")
-                if not ndi_lib.NDIlib_initialize():
-                    self.handle_error("Failed to initialize NDI")
-                    self.ndi_source_selector.addItem("NDI initialization failed")
-                    self.ndi_source_selector.show()
-                    self.preview_button.show()
-                    return
-                logging.info("NDI initialized successfully")
-
-                logging.info("Listing NDI sources...")
-                sources = NDIInput.list_sources()
-                if sources:
-                    self.ndi_source_selector.addItems(sources)
-                    self.ndi_source_selector.show()
-                    self.preview_button.show()
-                    logging.info(f"Found {len(sources)} NDI sources: {sources}")
-                else:
-                    self.ndi_source_selector.addItem("No NDI sources found")
-                    self.ndi_source_selector.show()
-                    self.preview_button.show()
-                    logging.warning("No NDI sources found.")
-            except Exception as e:
-                error_msg = f"Error listing NDI sources: {e}"
-                logging.error(error_msg)
-                self.handle_error(error_msg)
-                self.ndi_source_selector.addItem("Error listing sources")
-                self.ndi_source_selector.show()
-                self.preview_button.show()
+            # Keep the last known sources listed while a new round runs
+            if self._sources_model.rowCount() == 0 or self.ndi_source_selector.itemText(0) in _NDI_PLACEHOLDERS:
+                self._set_source_items([NDI_SEARCHING_TEXT])
+            self.ndi_source_selector.show()
+            self.preview_button.show()
+            # Discovery blocks for seconds, so it runs off the GUI thread
+            self._discover_ndi_sources(self._on_ndi_sources_found, self._on_ndi_discovery_failed)
             # Do not auto-start preview; wait for button click
         else:
             self.ndi_source_selector.hide()
@@ -193,39 +372,118 @@ class MainWindow(QMainWindow):
             # Start SDI source preview automatically
             self._start_source_preview("SDI Capture", None)
 
+    def _discover_ndi_sources(self, on_finished=None, on_failed=None):
+        """Start an NDI discovery round on the thread pool; results arrive on the GUI thread"""
+        discovery = _SourceDiscovery(self._ndi_ready)
+        if on_finished:
+            discovery.signals.finished.connect(on_finished)
+        if on_failed:
+            discovery.signals.failed.connect(on_failed)
+        QThreadPool.globalInstance().start(discovery)
+
+    def _on_ndi_sources_found(self, sources):
+        """Populate the NDI source selector from a finished discovery round"""
+        if self.input_selector.currentText() != "NDI Input":
+            return # User switched away while discovery was running
+        if sources:
+            self._set_source_items(sources)
+            logging.info(f"Found {len(sources)} NDI sources: {sources}")
+        else:
+            self._set_source_items([NDI_NO_SOURCES_TEXT])
+            logging.warning("No NDI sources found.")
+
+    def _on_ndi_discovery_failed(self, error_msg, placeholder):
+        """Report a failed discovery round in the status bar and source selector"""
+        if self.input_selector.currentText() != "NDI Input":
+            return
+        self.handle_error(error_msg)
+        self._set_source_items([placeholder])
+
+    def _set_source_items(self, items):
+        """Update the NDI source list in place, touching only rows that changed"""
+        old = self._sources_model.stringList()
+        if old == items:
+            return
+        current = self.ndi_source_selector.currentText()
+        with QSignalBlocker(self.ndi_source_selector):
+            model = self._sources_model
+            if len(items) < len(old):
+                model.removeRows(len(items), len(old) - len(items))
+            elif len(items) > len(old):
+                model.insertRows(len(old), len(items) - len(old))
+            for row, text in enumerate(items):
+                if row >= len(old) or old[row] != text:
+                    model.setData(model.index(row), text)
+            # Keep the user's selection if that source is still there
+            row = self.ndi_source_selector.findText(current)
+            self.ndi_source_selector.setCurrentIndex(row if row >= 0 else 0)
+
     def _start_source_preview(self, input_type, ndi_source_name):
         """Start a preview of the selected source in the left monitor"""
         self._stop_source_preview()
         logging.info(f"Starting source preview: {input_type}, {ndi_source_name}")
         if input_type == "NDI Input" and ndi_source_name:
             try:
-                self._source_preview_input = NDIInput(ndi_source_name=ndi_source_name)
-                self._source_preview_input.frame_ready.connect(self.source_preview.update_frame)
-                self._source_preview_input.error_occurred.connect(self.handle_error)
+                self._source_preview_input = self._pooled_preview_input(input_type, ndi_source_name)
                 self._source_preview_input.start()
+                self._source_preview_throttle.start()
                 logging.info("NDI source preview thread started.")
             except Exception as e:
                 self.handle_error(f"Failed to start NDI source preview: {e}")
         elif input_type == "SDI Capture":
             try:
-                self._source_preview_input = SDICapture()
-                self._source_preview_input.frame_ready.connect(self.source_preview.update_frame)
-                self._source_preview_input.error_occurred.connect(self.handle_error)
+                self._source_preview_input = self._pooled_preview_input(input_type, None)
                 self._source_preview_input.start()
+                self._source_preview_throttle.start()
                 logging.info("SDI source preview thread started.")
             except Exception as e:
                 self.handle_error(f"Failed to start SDI source preview: {e}")
 
+    def _pooled_preview_input(self, input_type, ndi_source_name):
+        """Return a preview input for the source, reusing a paused one when possible"""
+        key = (input_type, ndi_source_name)
+        preview_input = self._source_preview_pool.get(key)
+        if preview_input is not None:
+            self._source_preview_pool.move_to_end(key)
+            return preview_input
+
+        if input_type == "NDI Input":
+            from .ndi_input import NDIInput
+            preview_input = NDIInput(ndi_source_name=ndi_source_name)
+        else:
+            from .sdi_capture import SDICapture
+            preview_input = SDICapture()
+        # The preview converts the native (usually UYVY) frames itself, at its own
+        # throttled rate, so the input skips its BGR conversion. The connections
+        # stay with the pooled input.
+        preview_input.raw_frame_ready.connect(self._source_preview_throttle.set_latest, Qt.ConnectionType.DirectConnection)
+        preview_input.error_occurred.connect(self.handle_error)
+        self._source_preview_pool[key] = preview_input
+        while len(self._source_preview_pool) > SOURCE_PREVIEW_POOL_SIZE:
+            _, evicted = self._source_preview_pool.popitem(last=False)
+            evicted.stop()
+        return preview_input
+
     def _stop_source_preview(self):
-        """Stop the source preview thread if running"""
+        """Pause the source preview input; it stays open in the pool"""
         if hasattr(self, '_source_preview_input') and self._source_preview_input:
             try:
-                self._source_preview_input.stop()
+                self._source_preview_input.pause()
             except Exception:
                 pass
             self._source_preview_input = None
+        self._source_preview_throttle.stop()
         self.source_preview.update_frame(None)
 
+    def _drain_source_preview_pool(self):
+        """Close every pooled preview input"""
+        while self._source_preview_pool:
+            _, preview_input = self._source_preview_pool.popitem()
+            try:
+                preview_input.stop()
+            except Exception:
+                pass
+
     def handle_error(self, error_msg):
         """Handle error messages from components"""
         self.status_label.setText(f"Error: {error_msg}")
@@ -243,13 +501,18 @@ class MainWindow(QMainWindow):
         # Determine selected input
         input_type = self.input_selector.currentText()
         if input_type == "SDI Capture":
+            # A paused preview capture still holds the DeckLink input mode
+            pooled_capture = self._source_preview_pool.pop(("SDI Capture", None), None)
+            if pooled_capture is not None:
+                pooled_capture.stop()
             self.current_input = self.sdi_capture
         elif input_type == "NDI Input":
             selected_ndi_source = self.ndi_source_selector.currentText()
-            if selected_ndi_source == "No NDI sources found":
+            if selected_ndi_source in _NDI_PLACEHOLDERS:
                 self.handle_error("Cannot start NDI input: No NDI sources selected or found.")
                 return
             try:
+                from .ndi_input import NDIInput
                 # Re-instantiate NDIInput with the selected source name
                 self.ndi_input = NDIInput(ndi_source_name=selected_ndi_source)
                 self.ndi_input.error_occurred.connect(self.handle_error) # Re-connect signal
@@ -269,15 +532,23 @@ class MainWindow(QMainWindow):
             self.handle_error("Input or Output module not initialized correctly.")
             return
 
-        # Connect frame_ready signal from current input to handle_frame
-        try:
-            self.current_input.frame_ready.disconnect() # Disconnect previous connections
-        except TypeError:
-            pass # No previous connection
-        self.current_input.frame_ready.connect(self.handle_frame)
+        # Connect the input's frame signal straight to the output
+        self._disconnect_input_frames()
+        # Hand the output the input's native frames (UYVY from SDI, a borrowed view
+        # of the received UYVY/BGRA buffer from NDI) when it can take them, so no
+        # conversion or copy happens between input and output
+        frame_signal = self.current_input.frame_ready
+        if getattr(self.current_output, 'accepts_raw_frames', False) and hasattr(self.current_input, 'raw_frame_ready'):
+            frame_signal = self.current_input.raw_frame_ready
+        # Both run on the capture thread: frames reach the output without a GUI
+        # thread hop, and the preview only keeps a reference to the newest frame
+        for slot in (self.current_output.send_frame, self._preview_throttle.set_latest):
+            self._frame_connections.append(
+                (frame_signal, frame_signal.connect(slot, Qt.ConnectionType.DirectConnection)))
 
         if self.current_input.start():
             if self.current_output.start():
+                self._preview_throttle.start()
                 self.status_label.setText(f"Running: {input_type} to {output_type}")
                 self.start_button.setEnabled(False)
                 self.stop_button.setEnabled(True)
@@ -289,32 +560,31 @@ class MainWindow(QMainWindow):
     
     def stop_conversion(self):
         """Stop the current conversion process"""
+        self._preview_throttle.stop()
         if self.current_input:
             self.current_input.stop()
+        self._disconnect_input_frames()
         if self.current_output:
             self.current_output.stop()
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.status_label.setText("Stopped")
         
-    def handle_frame(self, frame):
-        """Handle incoming frames from the current input"""
-        # Update preview
-        self.preview.update_frame(frame)
-        
-        # Send to current output
-        self.current_output.send_frame(frame)
-        
+    def _disconnect_input_frames(self):
+        """Drop the frame connections made by start_conversion"""
+        for signal, connection in self._frame_connections:
+            signal.disconnect(connection)
+        self._frame_connections.clear()
+
     def closeEvent(self, event):
         """Handle window close"""
         self.stop_conversion()
-        # Clean up NDI
-        if ndi_lib:
-            try:
-                ndi_lib.NDIlib_destroy()
-                logging.info("NDI library destroyed")
-            except Exception as e:
-                logging.error(f"Error destroying NDI library: {e}")
+        self._stop_source_preview()
+        self._drain_source_preview_pool()
+        # Clean up NDI in the background (only if a backend actually loaded the library)
+        ndi_output = sys.modules.get(f"{__package__}.ndi_output")
+        if ndi_output:
+            ndi_output.destroy_ndi_async()
         super().closeEvent(event)
 
     def _on_preview_clicked(self):
@@ -322,9 +592,18 @@ class MainWindow(QMainWindow):
         input_type = self.input_selector.currentText()
         if input_type == "NDI Input":
             selected_ndi_source = self.ndi_source_selector.currentText()
-            if selected_ndi_source and selected_ndi_source != "No NDI sources found":
+            if selected_ndi_source and selected_ndi_source not in _NDI_PLACEHOLDERS:
                 self._start_source_preview("NDI Input", selected_ndi_source)
 
+def wait_for_ndi_shutdown(timeout=0.5):
+    """Wait up to `timeout` seconds for the background NDI teardown; True if it has finished"""
+    ndi_output = sys.modules.get(f"{__package__}.ndi_output")
+    thread = ndi_output.destroy_ndi_async() if ndi_output else None
+    if thread is None:
+        return True
+    thread.join(timeout)
+    return not thread.is_alive()
+
 def main():
     app = QApplication(sys.argv)
     window = MainWindow()
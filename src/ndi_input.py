@@ -1,18 +1,23 @@
 import os
 import sys
-import cv2
 import numpy as np
 import ctypes
 import logging
 import traceback
-import time # Import time for sleep
-from PyQt6.QtCore import QThread, pyqtSignal, QWaitCondition, QMutex
-from PyQt6.QtGui import QImage, QPixmap
+import time # Timestamps for the source list cache
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
 
 try:
-    from .config import NDI_SDK_PATH, NDI_LIB_PATH, NDI_INPUT_NAME
+    from .config import (NDI_SDK_PATH, NDI_LIB_PATH, NDI_INPUT_NAME, NDI_SOURCES_CACHE_TTL, NDI_CAPTURE_TIMEOUT_MS,
+                         NDI_RECEIVE_THREAD_AFFINITY, FRAME_RING_SLOTS)
+    from .frame_ring import FrameRing
+    from .color_convert import uyvy_to_bgra
 except ImportError:
-    from config import NDI_SDK_PATH, NDI_LIB_PATH, NDI_INPUT_NAME
+    from config import (NDI_SDK_PATH, NDI_LIB_PATH, NDI_INPUT_NAME, NDI_SOURCES_CACHE_TTL, NDI_CAPTURE_TIMEOUT_MS,
+                        NDI_RECEIVE_THREAD_AFFINITY, FRAME_RING_SLOTS)
+    from frame_ring import FrameRing
+    from color_convert import uyvy_to_bgra
 
 # Configure logging (if not already configured by main app)
 if not logging.getLogger().handlers:
@@ -66,54 +71,52 @@ class NDIlib_find_create_t(ctypes.Structure):
         ("p_extra_ips", ctypes.c_char_p)
     ]
 
-# NDI receiver create structure
+# NDI receiver create structure (NDIlib_recv_create_t, as taken by NDIlib_recv_create_v2)
 class NDIlib_recv_create_v2_t(ctypes.Structure):
     _fields_ = [
-        ("p_ndi_name", ctypes.c_char_p),
-        ("p_groups", ctypes.c_char_p),
-        ("p_extra_ips", ctypes.c_char_p),
+        ("source_to_connect_to", NDIlib_source_t),
         ("color_format", ctypes.c_int),
         ("bandwidth", ctypes.c_int),
         ("allow_video_fields", ctypes.c_bool)
     ]
 
-# NDI constants (from NDI SDK)
-NDIlib_recv_color_format_BGRX_BGRA = 101
-NDIlib_recv_bandwidth_highest = 0
-NDIlib_frame_type_video = 1
-NDIlib_frame_type_error = 4
+def NDI_LIB_FOURCC(code):
+    """Python equivalent of the SDK's NDI_LIB_FOURCC(a, b, c, d) macro"""
+    return int.from_bytes(code.encode('ascii'), 'little')
 
-# NDI find functions prototypes
-ndi_lib.NDIlib_find_create2.argtypes = [ctypes.POINTER(NDIlib_find_create_t)]
-ndi_lib.NDIlib_find_create2.restype = ctypes.c_void_p
+# NDI function prototypes (skipped when the library failed to load, so the module
+# still imports and NDIInput reports the error instead)
+if ndi_lib:
+    ndi_lib.NDIlib_find_create2.argtypes = [ctypes.POINTER(NDIlib_find_create_t)]
+    ndi_lib.NDIlib_find_create2.restype = ctypes.c_void_p
 
-ndi_lib.NDIlib_recv_create_v2.argtypes = [ctypes.POINTER(NDIlib_recv_create_v2_t)]
-ndi_lib.NDIlib_recv_create_v2.restype = ctypes.c_void_p
+    ndi_lib.NDIlib_recv_create_v2.argtypes = [ctypes.POINTER(NDIlib_recv_create_v2_t)]
+    ndi_lib.NDIlib_recv_create_v2.restype = ctypes.c_void_p
 
-ndi_lib.NDIlib_recv_capture_v2.argtypes = [ctypes.c_void_p, ctypes.POINTER(NDIVideoFrame), ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int]
-ndi_lib.NDIlib_recv_capture_v2.restype = ctypes.c_int
+    ndi_lib.NDIlib_recv_capture_v2.argtypes = [ctypes.c_void_p, ctypes.POINTER(NDIVideoFrame), ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int]
+    ndi_lib.NDIlib_recv_capture_v2.restype = ctypes.c_int
 
-ndi_lib.NDIlib_recv_free_video_v2.argtypes = [ctypes.c_void_p, ctypes.POINTER(NDIVideoFrame)]
-ndi_lib.NDIlib_recv_free_video_v2.restype = None
+    ndi_lib.NDIlib_recv_free_video_v2.argtypes = [ctypes.c_void_p, ctypes.POINTER(NDIVideoFrame)]
+    ndi_lib.NDIlib_recv_free_video_v2.restype = None
 
-ndi_lib.NDIlib_recv_destroy.argtypes = [ctypes.c_void_p]
-ndi_lib.NDIlib_recv_destroy.restype = None
+    ndi_lib.NDIlib_recv_destroy.argtypes = [ctypes.c_void_p]
+    ndi_lib.NDIlib_recv_destroy.restype = None
 
-ndi_lib.NDIlib_initialize.argtypes = []
-ndi_lib.NDIlib_initialize.restype = ctypes.c_bool
+    ndi_lib.NDIlib_initialize.argtypes = []
+    ndi_lib.NDIlib_initialize.restype = ctypes.c_bool
 
-ndi_lib.NDIlib_find_destroy.argtypes = [ctypes.c_void_p]
-ndi_lib.NDIlib_find_destroy.restype = None
+    ndi_lib.NDIlib_find_destroy.argtypes = [ctypes.c_void_p]
+    ndi_lib.NDIlib_find_destroy.restype = None
 
-ndi_lib.NDIlib_find_wait_for_sources.argtypes = [ctypes.c_void_p, ctypes.c_int]
-ndi_lib.NDIlib_find_wait_for_sources.restype = ctypes.c_bool
+    ndi_lib.NDIlib_find_wait_for_sources.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    ndi_lib.NDIlib_find_wait_for_sources.restype = ctypes.c_bool
 
-ndi_lib.NDIlib_find_get_current_sources.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
-ndi_lib.NDIlib_find_get_current_sources.restype = ctypes.POINTER(NDIlib_source_t)
+    ndi_lib.NDIlib_find_get_current_sources.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+    ndi_lib.NDIlib_find_get_current_sources.restype = ctypes.POINTER(NDIlib_source_t)
 
-# Add missing function prototypes
-ndi_lib.NDIlib_recv_connect.argtypes = [ctypes.c_void_p, ctypes.POINTER(NDIlib_source_t)]
-ndi_lib.NDIlib_recv_connect.restype = ctypes.c_bool
+    # Add missing function prototypes
+    ndi_lib.NDIlib_recv_connect.argtypes = [ctypes.c_void_p, ctypes.POINTER(NDIlib_source_t)]
+    ndi_lib.NDIlib_recv_connect.restype = None # void in the SDK
 
 # Remove prototype definitions for functions causing AttributeError
 # ndi_lib.NDIlib_recv_queue.argtypes = [ctypes.c_void_p, ctypes.POINTER(NDIVideoFrame)]
@@ -125,14 +128,21 @@ ndi_lib.NDIlib_recv_connect.restype = ctypes.c_bool
 # ndi_lib.NDIlib_recv_clear.argtypes = [ctypes.c_void_p]
 # ndi_lib.NDIlib_recv_clear.restype = None
 
-# Add missing constants
-NDIlib_recv_color_format_RGBX_RGBA = 100
-NDIlib_recv_color_format_BGRX_BGRA = 101
-NDIlib_recv_color_format_RGBX_RGBA_Flipped = 200
-NDIlib_recv_color_format_BGRX_BGRA_Flipped = 201
+# NDI constants (from NDI SDK)
+NDIlib_recv_color_format_BGRX_BGRA = 0
+NDIlib_recv_color_format_UYVY_BGRA = 1
+NDIlib_recv_color_format_RGBX_RGBA = 2
+NDIlib_recv_color_format_UYVY_RGBA = 3
+NDIlib_recv_color_format_fastest = 100 # UYVY (UYVA with alpha), no decode-side colour conversion
+NDIlib_recv_color_format_best = 101
+
+NDIlib_recv_bandwidth_lowest = 0
+NDIlib_recv_bandwidth_highest = 100
 
-NDIlib_recv_bandwidth_highest = 0
-NDIlib_recv_bandwidth_lowest = 100
+NDIlib_FourCC_video_type_UYVY = NDI_LIB_FOURCC('UYVY')
+NDIlib_FourCC_video_type_UYVA = NDI_LIB_FOURCC('UYVA') # UYVY plane followed by an alpha plane
+NDIlib_FourCC_video_type_BGRA = NDI_LIB_FOURCC('BGRA')
+NDIlib_FourCC_video_type_BGRX = NDI_LIB_FOURCC('BGRX')
 
 NDIlib_frame_type_none = 0
 NDIlib_frame_type_video = 1
@@ -141,16 +151,24 @@ NDIlib_frame_type_metadata = 3
 NDIlib_frame_type_error = 4
 
 class NDIInput(QThread):
-    frame_ready = pyqtSignal(np.ndarray)
+    frame_ready = pyqtSignal(np.ndarray) # BGR frames, valid only during the emit
+    raw_frame_ready = pyqtSignal(np.ndarray) # View of the NDI buffer (UYVY, or BGRA), valid only during the emit
     error_occurred = pyqtSignal(str)
+
+    # Last discovery result shared by all callers: (time.monotonic() timestamp, source names)
+    _sources_cache = (0.0, [])
+    _sources_lock = threading.Lock()
     
     def __init__(self, ndi_source_name=None): # Added ndi_source_name parameter
         super().__init__()
         self.receiver = None
         self.is_running = False
-        self.wait_condition = QWaitCondition()
-        self.mutex = QMutex()
         self.ndi_source_name = ndi_source_name # Store the selected source name
+        # Use the provided NDI source name, or default from config if not provided. The
+        # encoded name is kept on the instance because the source struct points into it.
+        self._source_name_b = (ndi_source_name or NDI_INPUT_NAME).encode('utf-8')
+        self._source_struct = NDIlib_source_t(p_ndi_name=self._source_name_b, p_url_address=None)
+        self._ring = FrameRing(FRAME_RING_SLOTS) # Reused BGRA buffers for BGR frame_ready consumers
         try:
             self._initialize_ndi()
         except Exception as e:
@@ -169,17 +187,16 @@ class NDIInput(QThread):
             logging.info("NDIlib_initialize() succeeded.")
             
             # Create receiver description
+            # Frames are received in the sender's native 4:2:2 (UYVY) where possible:
+            # half the bytes of BGRA, and no colour conversion inside the SDK
             recv_create_desc = NDIlib_recv_create_v2_t()
-            recv_create_desc.color_format = NDIlib_recv_color_format_BGRX_BGRA
+            recv_create_desc.color_format = NDIlib_recv_color_format_fastest
             recv_create_desc.bandwidth = NDIlib_recv_bandwidth_highest
             recv_create_desc.allow_video_fields = True
-            recv_create_desc.p_groups = None
-            recv_create_desc.p_extra_ips = None
             
-            # Use the provided NDI source name, or default from config if not provided
             source_name_to_use = self.ndi_source_name if self.ndi_source_name else NDI_INPUT_NAME
             logging.info(f"NDIInput: Using source name: {source_name_to_use}")
-            recv_create_desc.p_ndi_name = source_name_to_use.encode('utf-8')
+            recv_create_desc.source_to_connect_to = self._source_struct
 
             # Create NDI receiver
             logging.info("Calling NDIlib_recv_create_v2()...")
@@ -189,17 +206,10 @@ class NDIInput(QThread):
                 raise RuntimeError(f"Failed to create NDI receiver for source: {source_name_to_use}")
             logging.info("NDIlib_recv_create_v2 succeeded.")
             
-            # Create source structure for connection
-            source = NDIlib_source_t()
-            source.p_ndi_name = source_name_to_use.encode('utf-8')
-            source.p_url_address = None
             logging.info(f"NDIInput: Connecting to source: {source_name_to_use}")
             
             # Connect to the source
-            result = ndi_lib.NDIlib_recv_connect(self.receiver, ctypes.byref(source))
-            if not result:
-                logging.error(f"NDIlib_recv_connect failed for source: {source_name_to_use}")
-                raise RuntimeError(f"Failed to connect to NDI source: {source_name_to_use}")
+            ndi_lib.NDIlib_recv_connect(self.receiver, ctypes.byref(self._source_struct))
             logging.info(f"Successfully connected to NDI source: {source_name_to_use}")
         except Exception as e:
             error_msg = f"NDI receiver initialization in NDIInput failed: {e}\n{traceback.format_exc()}"
@@ -215,45 +225,72 @@ class NDIInput(QThread):
             return
             
         self.is_running = True
+        if NDI_RECEIVE_THREAD_AFFINITY and sys.platform == 'win32':
+            # Keep the thread (and its cache-warm buffers) on one core
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadAffinityMask.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+            kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+            if not kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), NDI_RECEIVE_THREAD_AFFINITY):
+                logging.warning(f"SetThreadAffinityMask({NDI_RECEIVE_THREAD_AFFINITY:#x}) failed for the NDI receive thread")
         video_frame = NDIVideoFrame()
+        # Bound once: the loop below runs for every received frame
+        receiver = self.receiver
+        capture = ndi_lib.NDIlib_recv_capture_v2
+        free_video = ndi_lib.NDIlib_recv_free_video_v2
+        video_frame_ref = ctypes.byref(video_frame)
+        as_array = np.ctypeslib.as_array
         
         while self.is_running:
             # Wait for a frame
-            t = ndi_lib.NDIlib_recv_capture_v2(
-                self.receiver,
-                ctypes.byref(video_frame),
+            t = capture(
+                receiver,
+                video_frame_ref,
                 None, # audio_frame
                 None, # metadata_frame
-                1000 # timeout_ms
+                NDI_CAPTURE_TIMEOUT_MS # blocks until a frame arrives; short so stop() is noticed quickly
             )
             
             if t == NDIlib_frame_type_video:
                 if video_frame.p_data:
                     try:
-                        # Convert NDI frame to numpy array (BGRA)
-                        frame_data = ctypes.cast(video_frame.p_data, ctypes.POINTER(ctypes.c_ubyte * (video_frame.yres * video_frame.line_stride_in_bytes)))
-                        np_frame = np.frombuffer(frame_data.contents, dtype=np.uint8)
-                        
-                        # Reshape to BGRA
-                        bgra_frame = np_frame.reshape((video_frame.yres, video_frame.xres, 4))
+                        # Zero-copy view of NDI's own buffer; it is only valid until
+                        # NDIlib_recv_free_video_v2 below, so every receiver is connected
+                        # with DirectConnection and must copy anything it keeps
+                        yres, xres = video_frame.yres, video_frame.xres
+                        fourcc = video_frame.FourCC
+                        if fourcc == NDIlib_FourCC_video_type_UYVY or fourcc == NDIlib_FourCC_video_type_UYVA:
+                            channels = 2 # UYVA's alpha plane follows the UYVY plane and is ignored
+                        elif fourcc == NDIlib_FourCC_video_type_BGRA or fourcc == NDIlib_FourCC_video_type_BGRX:
+                            channels = 4
+                        else:
+                            raise ValueError(f"unsupported NDI FourCC {fourcc.to_bytes(4, 'little')!r}")
+                        stride = video_frame.line_stride_in_bytes
+                        if stride < xres * channels:
+                            raise ValueError(f"line stride {stride} is too small for {xres} pixels")
+                        # Lines may be padded: slice the padding off each row
+                        rows = as_array(video_frame.p_data, shape=(yres, stride))
+                        raw_frame = rows[:, :xres * channels].reshape((yres, xres, channels))
+                        raw_frame.flags.writeable = False # NDI owns this memory
+                        self.raw_frame_ready.emit(raw_frame)
                         
-                        # Convert BGRA to BGR for consistency with other modules
-                        bgr_frame = cv2.cvtColor(bgra_frame, cv2.COLOR_BGRA2BGR)
-                        
-                        self.frame_ready.emit(bgr_frame)
+                        # BGR for consistency with other modules
+                        if channels == 4:
+                            # A strided view that just skips the alpha bytes
+                            self.frame_ready.emit(raw_frame[..., :3])
+                        elif self.receivers(self.frame_ready) > 0:
+                            # Converted into a reused BGRA buffer, only when someone listens
+                            bgra = uyvy_to_bgra(raw_frame, self._ring.next((yres, xres, 4)))
+                            self.frame_ready.emit(bgra[..., :3])
                         
                     except Exception as e:
                         self.error_occurred.emit(f"Error processing NDI frame: {e}")
                     finally:
-                        ndi_lib.NDIlib_recv_free_video_v2(self.receiver, ctypes.byref(video_frame))
+                        free_video(receiver, video_frame_ref)
             
             elif t == NDIlib_frame_type_error:
                 self.error_occurred.emit("NDI receiver error")
                 break
             
-            # Add a small sleep to prevent busy-waiting if no frames are coming
-            self.msleep(1)
-            
         self.is_running = False
         
     def start(self):
@@ -263,7 +300,9 @@ class NDIInput(QThread):
             return False
         
         if not self.isRunning():
-            super().start()
+            # Frames must be drained every ~16 ms, so the receive thread is above normal;
+            # not time-critical, as it runs Python (holding the GIL) alongside the GUI
+            super().start(QThread.Priority.HighestPriority)
             self.is_running = True
             return True
         return False
@@ -274,6 +313,10 @@ class NDIInput(QThread):
         if self.isRunning():
             self.wait() # Wait for the thread to finish
 
+    def pause(self):
+        """Stop the receive thread; the receiver stays connected, so start() resumes quickly"""
+        self.stop()
+
     def __del__(self):
         """Cleanup NDI resources"""
         if self.receiver:
@@ -282,8 +325,20 @@ class NDIInput(QThread):
         # NDIlib_destroy() should be called once at application exit, not per object
 
     @staticmethod
-    def list_sources():
-        """List available NDI sources"""
+    def list_sources(max_age=NDI_SOURCES_CACHE_TTL):
+        """List available NDI sources, reusing a discovery result younger than max_age seconds"""
+        with NDIInput._sources_lock:
+            timestamp, sources = NDIInput._sources_cache
+            if timestamp and time.monotonic() - timestamp < max_age:
+                logging.info("Using cached NDI source list")
+                return list(sources)
+            sources = NDIInput._discover_sources()
+            NDIInput._sources_cache = (time.monotonic(), sources)
+            return list(sources)
+
+    @staticmethod
+    def _discover_sources():
+        """Run one NDI discovery round (blocks until sources show up, at most about 2 seconds)"""
         try:
             logging.info("Starting NDI source discovery...")
             
@@ -299,8 +354,11 @@ class NDIInput(QThread):
                 logging.error("Failed to create NDI find instance")
                 return []
 
+            # Returns as soon as the source list changes, giving up after 2 s
             logging.info("Waiting for sources to be discovered...")
-            time.sleep(2)  # Give time for discovery
+            for _ in range(10):
+                if ndi_lib.NDIlib_find_wait_for_sources(find_instance, 200):
+                    break
 
             # Get current sources
             num_sources = ctypes.c_int(0)
@@ -2,9 +2,9 @@ import logging
 import traceback
 import os
 import sys
-import cv2
 import numpy as np
 import ctypes
+import threading
 from PyQt6.QtCore import QObject, pyqtSignal
 
 # Configure logging (if not already configured by main app)
@@ -13,9 +13,20 @@ if not logging.getLogger().handlers:
                         format='%(asctime)s - %(levelname)s - %(message)s')
 
 try:
-    from .config import NDI_SDK_PATH, NDI_LIB_PATH, NDI_OUTPUT_NAME
+    from .config import NDI_SDK_PATH, NDI_LIB_PATH, NDI_OUTPUT_NAME, NDI_FRAME_RATE_N, NDI_FRAME_RATE_D, NDI_CLOCK_VIDEO, NDI_CLOCK_AUDIO, NDI_FOURCC
+    from .frame_ring import aligned_empty
 except ImportError:
-    from config import NDI_SDK_PATH, NDI_LIB_PATH, NDI_OUTPUT_NAME
+    from config import NDI_SDK_PATH, NDI_LIB_PATH, NDI_OUTPUT_NAME, NDI_FRAME_RATE_N, NDI_FRAME_RATE_D, NDI_CLOCK_VIDEO, NDI_CLOCK_AUDIO, NDI_FOURCC
+    from frame_ring import aligned_empty
+
+# Compiled cffi binding for the per-frame send (built by _ndi_cffi_build.py); ctypes is the fallback
+try:
+    try:
+        from ._ndi_cffi import ffi as _ffi, lib as _ndi_cffi_lib
+    except ImportError:
+        from _ndi_cffi import ffi as _ffi, lib as _ndi_cffi_lib
+except ImportError:
+    _ffi = _ndi_cffi_lib = None
 
 # Load NDI library
 ndi_lib = None # Initialize to None
@@ -54,10 +65,16 @@ class NDIlib_send_create_t(ctypes.Structure):
         ("clock_audio", ctypes.c_bool)
     ]
 
+def NDI_LIB_FOURCC(code):
+    """Python equivalent of the SDK's NDI_LIB_FOURCC(a, b, c, d) macro"""
+    return int.from_bytes(code.encode('ascii'), 'little')
+
 # NDI constants (from NDI SDK)
-NDIlib_FourCC_type_BGRA = 101 # Example value, actual value from NDI SDK
-NDIlib_frame_format_type_progressive = 1 # Example value, actual value from NDI SDK
-NDIlib_send_timecode_synthesize = 0 # Example value, actual value from NDI SDK
+NDIlib_FourCC_type_BGRA = NDI_LIB_FOURCC('BGRA')
+NDIlib_FourCC_type_UYVY = NDI_LIB_FOURCC('UYVY')
+NDI_NATIVE_FOURCC = NDI_LIB_FOURCC(NDI_FOURCC) # FourCC of 2-channel (4:2:2) input frames
+NDIlib_frame_format_type_progressive = 1
+NDIlib_send_timecode_synthesize = 0x7FFFFFFFFFFFFFFF # INT64_MAX: the SDK stamps the timecode
 
 # NDI function prototypes
 ndi_lib.NDIlib_initialize.argtypes = []
@@ -68,6 +85,12 @@ ndi_lib.NDIlib_send_create.restype = ctypes.c_void_p
 
 ndi_lib.NDIlib_send_send_video_v2.argtypes = [ctypes.c_void_p, ctypes.POINTER(NDIVideoFrame)]
 ndi_lib.NDIlib_send_send_video_v2.restype = None
+# Bound once: called for every frame
+if _ndi_cffi_lib is not None:
+    _send_send_video_v2 = _ndi_cffi_lib.NDIlib_send_send_video_v2
+    logging.info("NDIOutput sends frames through the cffi binding")
+else:
+    _send_send_video_v2 = ndi_lib.NDIlib_send_send_video_v2
 
 ndi_lib.NDIlib_send_destroy.argtypes = [ctypes.c_void_p]
 ndi_lib.NDIlib_send_destroy.restype = None
@@ -75,13 +98,48 @@ ndi_lib.NDIlib_send_destroy.restype = None
 ndi_lib.NDIlib_destroy.argtypes = []
 ndi_lib.NDIlib_destroy.restype = None
 
+_ndi_destroy_thread = None
+
+def _destroy_ndi():
+    try:
+        ndi_lib.NDIlib_destroy()
+        logging.info("NDI library destroyed")
+    except Exception as e:
+        logging.error(f"Error destroying NDI library: {e}")
+
+def destroy_ndi_async():
+    """Run NDIlib_destroy once, on a daemon thread so the caller is not blocked; returns the thread"""
+    global _ndi_destroy_thread
+    if _ndi_destroy_thread is None and ndi_lib:
+        _ndi_destroy_thread = threading.Thread(target=_destroy_ndi, name="NDIlib_destroy", daemon=True)
+        _ndi_destroy_thread.start()
+    return _ndi_destroy_thread
+
 class NDIOutput(QObject):
     error_occurred = pyqtSignal(str)
+    accepts_raw_frames = True # send_frame takes native UYVY/BGRA frames without conversion
     
     def __init__(self):
         super().__init__()
         self.sender = None
+        self._send_handle = None # self.sender, as the send function's binding expects it
         self.is_running = False
+        self._bgra_buf = None # Reused BGRA buffer for BGR input frames
+        # Reused frame descriptor; only the buffer-dependent fields change per frame
+        if _ffi is not None:
+            self._video_frame = _ffi.new("NDIlib_video_frame_v2_t *") # Zero-filled, so p_metadata is NULL
+            self._video_frame_ref = self._video_frame
+        else:
+            self._video_frame = NDIVideoFrame()
+            self._video_frame.p_metadata = None
+            self._video_frame_ref = ctypes.byref(self._video_frame)
+            # Writable alias of the p_data field, so a frame only costs one address store
+            self._p_data = ctypes.c_void_p.from_buffer(self._video_frame, NDIVideoFrame.p_data.offset)
+        self._video_frame.frame_rate_N = NDI_FRAME_RATE_N
+        self._video_frame.frame_rate_D = NDI_FRAME_RATE_D  # ~59.94 fps
+        self._video_frame.frame_format_type = NDIlib_frame_format_type_progressive
+        self._video_frame.timecode = NDIlib_send_timecode_synthesize
+        self._frame_layout = None # (xres, yres, FourCC, line stride) the descriptor is set up for
         try:
             self._initialize_ndi()
         except Exception as e:
@@ -100,14 +158,15 @@ class NDIOutput(QObject):
             sender_desc = NDIlib_send_create_t()
             sender_desc.p_ndi_name = NDI_OUTPUT_NAME.encode('utf-8')
             sender_desc.p_groups = None
-            sender_desc.clock_video = True
-            sender_desc.clock_audio = False
+            sender_desc.clock_video = NDI_CLOCK_VIDEO
+            sender_desc.clock_audio = NDI_CLOCK_AUDIO
             
             # Create NDI sender
             self.sender = ndi_lib.NDIlib_send_create(ctypes.byref(sender_desc))
             
             if not self.sender:
                 raise RuntimeError("Failed to create NDI sender")
+            self._send_handle = _ffi.cast("NDIlib_send_instance_t", self.sender) if _ffi is not None else self.sender
                 
         except Exception as e:
             error_msg = f"NDI sender initialization in NDIOutput failed: {e}\n{traceback.format_exc()}"
@@ -130,6 +189,7 @@ class NDIOutput(QObject):
         if self.sender:
             ndi_lib.NDIlib_send_destroy(self.sender)
             self.sender = None
+            self._send_handle = None
     
     def send_frame(self, frame):
         """Send a frame through NDI"""
@@ -137,27 +197,55 @@ class NDIOutput(QObject):
             return False
         
         try:
-            # Convert BGR to BGRA
-            bgra = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
-            
-            # Create NDI video frame
-            video_frame = NDIVideoFrame()
-            video_frame.xres = frame.shape[1]
-            video_frame.yres = frame.shape[0]
-            video_frame.FourCC = NDIlib_FourCC_type_BGRA
-            video_frame.frame_rate_N = 60000
-            video_frame.frame_rate_D = 1001  # ~59.94 fps
-            video_frame.picture_aspect_ratio = float(frame.shape[1]) / frame.shape[0]
-            video_frame.frame_format_type = NDIlib_frame_format_type_progressive
-            video_frame.timecode = NDIlib_send_timecode_synthesize
-            video_frame.p_data = bgra.ctypes.data_as(ctypes.POINTER(ctypes.c_ubyte))
-            video_frame.line_stride_in_bytes = frame.strides[0]
-            video_frame.p_metadata = None
-            
-            # Send the frame
-            ndi_lib.NDIlib_send_send_video_v2(self.sender, ctypes.byref(video_frame))
-            return True
+            if frame.shape[2] == 2:
+                # Native 4:2:2 frame from the input: NDI sends it as-is
+                return self._send_video(frame, NDI_NATIVE_FOURCC)
+            if frame.shape[2] == 4:
+                # BGRA frame (e.g. straight from an NDI receiver): also sent as-is
+                return self._send_video(frame, NDIlib_FourCC_type_BGRA)
+            # Convert BGR to BGRA, into a buffer reused across frames. Inputs normally
+            # hand over raw UYVY/BGRA frames, so OpenCV is only loaded if this is needed
+            import cv2
+            if self._bgra_buf is None or self._bgra_buf.shape[:2] != frame.shape[:2]:
+                self._bgra_buf = aligned_empty((frame.shape[0], frame.shape[1], 4))
+            cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA, dst=self._bgra_buf)
+            return self._send_video(self._bgra_buf, NDIlib_FourCC_type_BGRA)
             
         except Exception as e:
             self.error_occurred.emit(f"Error sending NDI frame: {e}")
             return False
+
+    def send_frame_bgra(self, bgra):
+        """Send an 8-bit BGRA frame without any conversion.
+
+        Rows may be padded (the line stride is taken from the array), but pixels
+        must be packed.
+        """
+        if not self.is_running or bgra is None or self.sender is None:
+            return False
+        if bgra.dtype != np.uint8 or bgra.ndim != 3 or bgra.shape[2] != 4 or bgra.strides[1:] != (4, 1):
+            self.error_occurred.emit(f"send_frame_bgra needs packed uint8 BGRA rows, got {bgra.dtype} {bgra.shape}")
+            return False
+        try:
+            return self._send_video(bgra, NDIlib_FourCC_type_BGRA)
+        except Exception as e:
+            self.error_occurred.emit(f"Error sending NDI frame: {e}")
+            return False
+
+    def _send_video(self, data, fourcc):
+        """Point the reused frame descriptor at the pixel buffer and send it"""
+        layout = (data.shape[1], data.shape[0], fourcc, data.strides[0])
+        if layout != self._frame_layout:
+            # Only when the stream's resolution or format changes
+            video_frame = self._video_frame
+            video_frame.xres, video_frame.yres, video_frame.FourCC, video_frame.line_stride_in_bytes = layout
+            video_frame.picture_aspect_ratio = float(layout[0]) / layout[1]
+            self._frame_layout = layout
+        if _ffi is not None:
+            self._video_frame.p_data = _ffi.cast("uint8_t *", data.ctypes.data)
+        else:
+            self._p_data.value = data.ctypes.data
+        
+        # Send the frame (synchronous: NDI is done with the buffer when this returns)
+        _send_send_video_v2(self._send_handle, self._video_frame_ref)
+        return True
@@ -0,0 +1,66 @@
+"""Per-frame kernels for the preview path.
+
+UYVY frames are converted to RGB and downscaled in a single pass, so the
+full-resolution RGB image is never materialized. Numba is optional: without
+it a vectorized NumPy version of the same kernel is used.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# BT.601 limited-range coefficients, matching cv2.COLOR_YUV2RGB_UYVY
+_CY, _CVR, _CUG, _CVG, _CUB = 1.164, 1.596, -0.391, -0.813, 2.018
+
+def preview_shape(frame_shape, max_width, max_height):
+    """Return (step, out_height, out_width) for previewing a frame in a max_width x max_height area"""
+    height, width = frame_shape[:2]
+    step = max(1, min(width // max(max_width, 1), height // max(max_height, 1)))
+    return step, height // step, width // step
+
+def _uyvy_to_rgb_downscale_numpy(src, dst, step):
+    out_h, out_w = dst.shape[:2]
+    rows = src[:out_h * step:step]
+    x = np.arange(out_w) * step
+    macro = x & ~1 # First byte column of each pixel's U Y V Y macropixel
+    c = np.maximum(rows[:, x, 1].astype(np.float32) - 16.0, 0.0) * _CY
+    d = rows[:, macro, 0].astype(np.float32) - 128.0
+    e = rows[:, macro + 1, 0].astype(np.float32) - 128.0
+    np.clip(c + _CVR * e + 0.5, 0, 255, out=dst[..., 0], casting='unsafe')
+    np.clip(c + _CUG * d + _CVG * e + 0.5, 0, 255, out=dst[..., 1], casting='unsafe')
+    np.clip(c + _CUB * d + 0.5, 0, 255, out=dst[..., 2], casting='unsafe')
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _uyvy_to_rgb_downscale_numba(src, dst, step):
+        out_h, out_w = dst.shape[0], dst.shape[1]
+        for oy in prange(out_h):
+            sy = oy * step
+            for ox in range(out_w):
+                sx = ox * step
+                macro = sx - (sx & 1)
+                c = max(np.float32(src[sy, sx, 1]) - 16.0, 0.0) * _CY
+                d = np.float32(src[sy, macro, 0]) - 128.0
+                e = np.float32(src[sy, macro + 1, 0]) - 128.0
+                r = c + _CVR * e + 0.5
+                g = c + _CUG * d + _CVG * e + 0.5
+                b = c + _CUB * d + 0.5
+                dst[oy, ox, 0] = np.uint8(min(max(r, 0.0), 255.0))
+                dst[oy, ox, 1] = np.uint8(min(max(g, 0.0), 255.0))
+                dst[oy, ox, 2] = np.uint8(min(max(b, 0.0), 255.0))
+
+def uyvy_to_rgb_downscale(src, dst, step):
+    """Convert a (H, W, 2) UYVY frame to RGB, keeping every `step`-th pixel, into dst (H//step, W//step, 3)"""
+    if HAVE_NUMBA:
+        _uyvy_to_rgb_downscale_numba(src, dst, step)
+    else:
+        _uyvy_to_rgb_downscale_numpy(src, dst, step)
+    return dst
+
+def warm_up():
+    """Compile the kernel ahead of the first frame (no-op without Numba)"""
+    if HAVE_NUMBA:
+        uyvy_to_rgb_downscale(np.zeros((4, 4, 2), np.uint8), np.empty((2, 2, 3), np.uint8), 2)
@@ -1,9 +1,10 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QRect
 from PyQt6.QtGui import QImage, QPainter
-import cv2
 import numpy as np
 
+QIMAGE_CACHE_SIZE = 2 # Matches the preview throttle's double buffer
+
 class PreviewWidget(QWidget):
     def __init__(self):
         super().__init__()
@@ -11,31 +12,68 @@ class PreviewWidget(QWidget):
         self.setMinimumSize(640, 360)
         self.frame = None
         self.qimage = None
+        self._rgb_frame = None
+        self._preview_buf = None # Reused RGB/BGRA buffer for UYVY frames
+        # (buffer address, shape, row stride, format) -> (QImage, array it wraps); one entry
+        # per buffer the frames arrive in, e.g. the preview throttle's two alternating buffers
+        self._qimage_cache = {}
         
     def update_frame(self, frame):
         """Update the preview with a new frame"""
         if frame is not None:
-            # Convert frame to RGB for display
+            # Pick the QImage format matching the frame's byte order, so no channel
+            # swap is needed for display
             if len(frame.shape) == 2:
-                # If grayscale, convert to RGB
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+                rgb_frame, image_format = frame, QImage.Format.Format_Grayscale8
+            elif frame.shape[2] == 2:
+                # Native 4:2:2 (UYVY) frame straight from the input: convert and
+                # downscale to roughly the widget size in one pass
+                rgb_frame = self._downscale_uyvy(frame)
+                image_format = QImage.Format.Format_RGB32 if rgb_frame.shape[2] == 4 else QImage.Format.Format_RGB888
+            elif frame.shape[2] == 4:
+                # BGRA (e.g. from an NDI receiver), i.e. Qt's 0xffRRGGBB RGB32 layout
+                # on little-endian machines
+                rgb_frame, image_format = frame, QImage.Format.Format_RGB32
             else:
-                # If BGR (from OpenCV) or YUV, convert to RGB
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # BGR (from OpenCV); QImage needs packed pixels, not a view of BGRA
+                rgb_frame = frame if frame.strides[1] == 3 else np.ascontiguousarray(frame)
+                image_format = QImage.Format.Format_BGR888
             
             height, width = rgb_frame.shape[:2]
-            bytes_per_line = width * 3
+            bytes_per_line = rgb_frame.strides[0]
             
-            # Create QImage from the frame
-            self.qimage = QImage(
-                rgb_frame.data,
-                width,
-                height,
-                bytes_per_line,
-                QImage.Format.Format_RGB888
-            )
+            # The preview buffers are reused, so the QImage wrapping each one is reused as well
+            key = (rgb_frame.ctypes.data, rgb_frame.shape, bytes_per_line, image_format)
+            cached = self._qimage_cache.get(key)
+            if cached is None:
+                if len(self._qimage_cache) >= QIMAGE_CACHE_SIZE:
+                    del self._qimage_cache[next(iter(self._qimage_cache))] # Drop the oldest entry
+                # The QImage does not own its pixel buffer, so the entry keeps the array alive
+                cached = (QImage(rgb_frame.data, width, height, bytes_per_line, image_format), rgb_frame)
+                self._qimage_cache[key] = cached
+            self.qimage, self._rgb_frame = cached
             self.frame = frame
             self.update()
+
+    def _downscale_uyvy(self, frame):
+        """Convert a UYVY frame at about the widget's resolution into the reused buffer.
+
+        Returns RGB when downscaling, or BGRA from the SIMD converter when the
+        widget is large enough to show the frame at full resolution.
+        """
+        try:
+            from .preview_kernels import preview_shape, uyvy_to_rgb_downscale
+            from .color_convert import uyvy_to_bgra
+        except ImportError:
+            from preview_kernels import preview_shape, uyvy_to_rgb_downscale
+            from color_convert import uyvy_to_bgra
+        step, out_h, out_w = preview_shape(frame.shape, self.width(), self.height())
+        channels = 4 if step == 1 else 3
+        if self._preview_buf is None or self._preview_buf.shape != (out_h, out_w, channels):
+            self._preview_buf = np.empty((out_h, out_w, channels), dtype=np.uint8)
+        if step == 1:
+            return uyvy_to_bgra(frame, self._preview_buf)
+        return uyvy_to_rgb_downscale(frame, self._preview_buf, step)
         
     def paintEvent(self, event):
         if self.qimage is not None:
@@ -58,5 +96,6 @@ class PreviewWidget(QWidget):
                 x = 0
                 y = (self.height() - h) // 2
             
-            # Draw the image centered and scaled
-            painter.drawImage(x, y, self.qimage.scaled(w, h, Qt.AspectRatioMode.KeepAspectRatio))
+            # Draw the image centered and scaled by the painter, without a scaled copy
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawImage(QRect(x, y, w, h), self.qimage)
@@ -1,72 +1,32 @@
 import os
 import sys
-import cv2
 import numpy as np
 import ctypes
 import comtypes
-import comtypes.client
-from PyQt6.QtCore import QThread, pyqtSignal
-
-# COM constants
-S_OK = 0x00000000
-E_FAIL = 0x80004005
-CLSCTX_ALL = 0x17
-try:
-    from .config import DECKLINK_SDK_PATH, DECKLINK_IID, DECKLINK_MODE
-except ImportError:
-    from config import DECKLINK_SDK_PATH, DECKLINK_IID, DECKLINK_MODE
-
-class VideoFrameCallback(comtypes.COMObject):
-    _com_interfaces_ = ['IDeckLinkVideoInputCallback']
-    
-    def __init__(self, frame_callback):
-        super().__init__()
-        self._frame_callback = frame_callback
-        
-    def VideoInputFrameArrived(self, video_frame, audio_frame):
-        if not video_frame:
-            return S_OK
-            
-        try:
-            # Get frame data
-            frame_bytes = video_frame.GetBytes()
-            height = video_frame.GetHeight()
-            width = video_frame.GetWidth()
-            row_bytes = video_frame.GetRowBytes()
-            
-            # Convert to numpy array
-            frame = np.frombuffer(frame_bytes, dtype=np.uint8)
-            frame = frame.reshape((height, width, 2))  # YUY2 format
-            
-            # Convert YUY2 to BGR
-            bgr_frame = cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_YUY2)
-            
-            # Call the callback
-            self._frame_callback(bgr_frame)
-            
-        except Exception as e:
-            print(f"Error in frame callback: {e}")
-            
-        return S_OK
-        
-    def VideoInputFormatChanged(self, notification_events, format_):
-        return S_OK
-
-class SDICapture(QThread):
-    frame_ready = pyqtSignal(np.ndarray)
-    error_occurred = pyqtSignal(str)
-    
 import logging
+import threading
 import traceback
+from PyQt6.QtCore import QThread, pyqtSignal
 
 # COM constants
 S_OK = 0x00000000
 E_FAIL = 0x80004005
 CLSCTX_ALL = 0x17
 try:
-    from .config import DECKLINK_SDK_PATH, DECKLINK_IID, DECKLINK_MODE
+    from .config import (DECKLINK_SDK_PATH, IID_IDeckLink, IID_IDeckLinkInput, bmdModeHD1080p60,
+                         bmdFormat8BitYUV, bmdVideoInputFlagDefault, DECKLINK_FRAME_SHAPE, DECKLINK_FRAME_BYTES,
+                         FRAME_RING_SLOTS, ensure_decklink_module)
+    from .frame_ring import FrameRing, aligned_empty
+    from .color_convert import uyvy_to_bgra
 except ImportError:
-    from config import DECKLINK_SDK_PATH, DECKLINK_IID, DECKLINK_MODE
+    from config import (DECKLINK_SDK_PATH, IID_IDeckLink, IID_IDeckLinkInput, bmdModeHD1080p60,
+                        bmdFormat8BitYUV, bmdVideoInputFlagDefault, DECKLINK_FRAME_SHAPE, DECKLINK_FRAME_BYTES,
+                        FRAME_RING_SLOTS, ensure_decklink_module)
+    from frame_ring import FrameRing, aligned_empty
+    from color_convert import uyvy_to_bgra
+
+# ctypes array type covering one captured frame, built once
+_FrameBuffer = ctypes.c_ubyte * DECKLINK_FRAME_BYTES
 
 class VideoFrameCallback(comtypes.COMObject):
     _com_interfaces_ = ['IDeckLinkVideoInputCallback']
@@ -80,21 +40,21 @@ class VideoFrameCallback(comtypes.COMObject):
             return S_OK
             
         try:
-            # Get frame data
+            # Get frame data. The input is enabled in a fixed mode without format
+            # detection, so the geometry is known and not queried per frame
             frame_bytes = video_frame.GetBytes()
-            height = video_frame.GetHeight()
-            width = video_frame.GetWidth()
-            row_bytes = video_frame.GetRowBytes()
-            
-            # Convert to numpy array
-            frame = np.frombuffer(frame_bytes, dtype=np.uint8)
-            frame = frame.reshape((height, width, 2))  # YUY2 format
+            address = getattr(frame_bytes, 'value', frame_bytes) # void* out-param: int or c_void_p
+            if not address:
+                return S_OK
             
-            # Convert YUY2 to BGR
-            bgr_frame = cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_YUY2)
+            # Zero-copy numpy view of DeckLink's frame buffer. The frame is only
+            # guaranteed alive during this callback, which copies it
+            frame = np.frombuffer(_FrameBuffer.from_address(address), dtype=np.uint8)
+            frame = frame.reshape(DECKLINK_FRAME_SHAPE)  # UYVY (bmdFormat8BitYUV)
+            frame.flags.writeable = False
             
-            # Call the callback
-            self._frame_callback(bgr_frame)
+            # Call the callback with the native frame; conversion happens on demand
+            self._frame_callback(frame)
             
         except Exception as e:
             logging.error(f"Error in frame callback: {e}\n{traceback.format_exc()}")
@@ -105,7 +65,10 @@ class VideoFrameCallback(comtypes.COMObject):
         return S_OK
 
 class SDICapture(QThread):
-    frame_ready = pyqtSignal(np.ndarray)
+    """DeckLink capture. The COM callback only copies each frame into a triple
+    buffer; conversion and the frame signals run on this QThread."""
+    frame_ready = pyqtSignal(np.ndarray) # BGR frames (views into reused BGRA buffers)
+    raw_frame_ready = pyqtSignal(np.ndarray) # Native UYVY frames, (height, width, 2)
     error_occurred = pyqtSignal(str)
     
     def __init__(self):
@@ -114,8 +77,19 @@ class SDICapture(QThread):
         self.input = None
         self.callback = None
         self.is_running = False
+        self._video_input_enabled = False
+        self._ring = FrameRing(FRAME_RING_SLOTS) # Reused BGRA output buffers
+        # Triple buffer between the DeckLink callback (fills the write slot) and the
+        # worker (converts the read slot); they swap through the ready slot
+        self._inbox = None # Allocated by start()
+        self._inbox_write, self._inbox_ready, self._inbox_read = 0, 1, 2
+        self._inbox_fresh = False # The ready slot holds a frame the worker has not taken
+        self._inbox_lock = threading.Lock()
+        self._inbox_event = threading.Event()
+        self.dropped_frames = 0 # Frames replaced before the worker got to them
         try:
             comtypes.CoInitialize()
+            ensure_decklink_module()
             self._initialize_decklink()
         except Exception as e:
             error_msg = f"SDICapture initialization error: {e}\n{traceback.format_exc()}"
@@ -127,17 +101,17 @@ class SDICapture(QThread):
         try:
             # Create DeckLink instance
             self.decklink = comtypes.CoCreateInstance(
-                DECKLINK_IID['IDeckLink'],
+                IID_IDeckLink,
                 None,
                 comtypes.CLSCTX_ALL,
-                DECKLINK_IID['IDeckLink']
+                IID_IDeckLink
             )
             
             if not self.decklink:
                 raise RuntimeError("Failed to create DeckLink instance")
             
             # Get input interface
-            self.input = self.decklink.QueryInterface(DECKLINK_IID['IDeckLinkInput'])
+            self.input = self.decklink.QueryInterface(IID_IDeckLinkInput)
             if not self.input:
                 raise RuntimeError("Failed to get input interface")
             
@@ -147,15 +121,7 @@ class SDICapture(QThread):
             if result != 0:
                 raise RuntimeError(f"Failed to set callback: {result}")
             
-            # Set video input mode
-            result = self.input.EnableVideoInput(
-                DECKLINK_MODE['bmdModeHD1080p60'],
-                DECKLINK_MODE['bmdFormat8BitYUV'],
-                DECKLINK_MODE['bmdVideoInputFlagDefault']
-            )
-            
-            if result != 0:
-                raise RuntimeError(f"Failed to enable video input: {result}")
+            self._enable_video_input()
             
         except Exception as e:
             error_msg = f"DeckLink initialization in SDICapture failed: {e}\n{traceback.format_exc()}"
@@ -163,10 +129,60 @@ class SDICapture(QThread):
             self.error_occurred.emit(f"DeckLink init failed: {e}")
             self.input = None
     
+    def _enable_video_input(self):
+        """Set the video input mode"""
+        result = self.input.EnableVideoInput(
+            bmdModeHD1080p60,
+            bmdFormat8BitYUV,
+            bmdVideoInputFlagDefault
+        )
+        
+        if result != 0:
+            raise RuntimeError(f"Failed to enable video input: {result}")
+        self._video_input_enabled = True
+    
     def _handle_frame(self, frame):
-        """Handle incoming frames from callback"""
-        if self.is_running:
-            self.frame_ready.emit(frame)
+        """Publish a UYVY frame from the DeckLink callback to the worker thread"""
+        inbox = self._inbox
+        if not self.is_running or inbox is None:
+            return
+        # A plain copy, so the callback returns to DeckLink without waiting on
+        # the conversion or the consumers
+        np.copyto(inbox[self._inbox_write], frame)
+        with self._inbox_lock:
+            self._inbox_write, self._inbox_ready = self._inbox_ready, self._inbox_write
+            if self._inbox_fresh:
+                self.dropped_frames += 1
+            self._inbox_fresh = True
+        self._inbox_event.set()
+
+    def run(self):
+        """Worker loop: emit the newest captured frame, converting it if needed"""
+        inbox = self._inbox
+        while self.is_running:
+            if not self._inbox_event.wait(0.1):
+                continue
+            with self._inbox_lock:
+                self._inbox_event.clear()
+                if not self._inbox_fresh:
+                    continue
+                self._inbox_read, self._inbox_ready = self._inbox_ready, self._inbox_read
+                self._inbox_fresh = False
+            try:
+                self._emit_frame(inbox[self._inbox_read])
+            except Exception as e:
+                logging.error(f"Error processing SDI frame: {e}\n{traceback.format_exc()}")
+
+    def _emit_frame(self, frame):
+        """Emit a UYVY frame, and its BGR conversion if anyone consumes it"""
+        self.raw_frame_ready.emit(frame)
+        # Only pay for the colour conversion when someone consumes BGR frames
+        if self.receivers(self.frame_ready) > 0:
+            # One fused UYVY->BGRA pass (SIMD library, else OpenCV) into a reused
+            # buffer; BGR consumers get a view that skips the alpha bytes
+            height, width = frame.shape[:2]
+            bgra_frame = uyvy_to_bgra(frame, self._ring.next((height, width, 4)))
+            self.frame_ready.emit(bgra_frame[..., :3])
     
     def start(self):
         """Start capturing"""
@@ -175,26 +191,53 @@ class SDICapture(QThread):
             return False
             
         try:
+            if not self._video_input_enabled:
+                self._enable_video_input()
+            if self._inbox is None:
+                self._inbox = [aligned_empty(DECKLINK_FRAME_SHAPE) for _ in range(3)]
+            self._inbox_fresh = False
+            self.is_running = True
+            # Above normal so it keeps up with 60 Hz input, but not time-critical:
+            # it runs Python (holding the GIL) and must not starve the GUI or the
+            # DeckLink callback thread that feeds it
+            super().start(QThread.Priority.HighestPriority)
             result = self.input.StartStreams()
             if result != 0:
+                self._stop_worker()
                 raise RuntimeError(f"Failed to start streams: {result}")
-                
-            self.is_running = True
             return True
             
         except Exception as e:
             self.error_occurred.emit(str(e))
             return False
     
+    def _stop_worker(self):
+        """Stop the worker thread and wait for it to finish its current frame"""
+        self.is_running = False
+        self._inbox_event.set()
+        if self.isRunning():
+            self.wait()
+
+    def pause(self):
+        """Stop streaming but keep the video input enabled, so start() resumes quickly"""
+        self._stop_worker()
+        if self.input:
+            try:
+                self.input.StopStreams()
+            except Exception as e:
+                self.error_occurred.emit(f"Error pausing capture: {e}")
+    
     def stop(self):
         """Stop capturing"""
-        self.is_running = False
+        self._stop_worker()
         if self.input:
             try:
                 self.input.StopStreams()
                 self.input.DisableVideoInput()
+                self._video_input_enabled = False
             except Exception as e:
                 self.error_occurred.emit(f"Error stopping capture: {e}")
+        self._inbox = None
     
     def __del__(self):
         """Cleanup resources"""
@@ -4,7 +4,9 @@ import cv2
 import numpy as np
 import ctypes
 import comtypes
-import comtypes.client
+import logging
+import traceback
+from collections import deque
 from PyQt6.QtCore import QObject, pyqtSignal
 
 # COM constants
@@ -13,40 +15,79 @@ E_FAIL = 0x80004005
 CLSCTX_ALL = 0x17
 
 try:
-    from .config import DECKLINK_SDK_PATH, DECKLINK_IID, DECKLINK_MODE
+    from .config import (DECKLINK_SDK_PATH, IID_IDeckLink, IID_IDeckLinkOutput, bmdModeHD1080p60, bmdFormat8BitYUV,
+                         bmdVideoOutputFlagDefault, bmdFrameFlagDefault, DECKLINK_WIDTH, DECKLINK_HEIGHT,
+                         DECKLINK_ROW_BYTES, DECKLINK_FRAME_BYTES, DECKLINK_FRAME_SHAPE,
+                         DECKLINK_FRAME_DURATION, DECKLINK_TIME_SCALE, SDI_OUTPUT_MAX_BUFFERED_FRAMES, ensure_decklink_module)
 except ImportError:
-    from config import DECKLINK_SDK_PATH, DECKLINK_IID, DECKLINK_MODE
+    from config import (DECKLINK_SDK_PATH, IID_IDeckLink, IID_IDeckLinkOutput, bmdModeHD1080p60, bmdFormat8BitYUV,
+                        bmdVideoOutputFlagDefault, bmdFrameFlagDefault, DECKLINK_WIDTH, DECKLINK_HEIGHT,
+                        DECKLINK_ROW_BYTES, DECKLINK_FRAME_BYTES, DECKLINK_FRAME_SHAPE,
+                        DECKLINK_FRAME_DURATION, DECKLINK_TIME_SCALE, SDI_OUTPUT_MAX_BUFFERED_FRAMES, ensure_decklink_module)
 
-class SDIOutput(QObject):
-    error_occurred = pyqtSignal(str)
-    
-import logging
-import traceback
+# ctypes array type covering one output frame, built once
+_FrameBuffer = ctypes.c_ubyte * DECKLINK_FRAME_BYTES
 
-import logging
-import traceback
+def _frame_address(video_frame):
+    """Address of a DeckLink frame's pixel buffer"""
+    frame_bytes = video_frame.GetBytes()
+    return getattr(frame_bytes, 'value', frame_bytes) # void* out-param: int or c_void_p
 
-# COM constants
-S_OK = 0x00000000
-E_FAIL = 0x80004005
-CLSCTX_ALL = 0x17
+_VideoOutputCallback = None
 
-try:
-    from .config import DECKLINK_SDK_PATH, DECKLINK_IID, DECKLINK_MODE
-except ImportError:
-    from config import DECKLINK_SDK_PATH, DECKLINK_IID, DECKLINK_MODE
+def _video_output_callback_class(decklink_api):
+    """Return the IDeckLinkVideoOutputCallback implementation, defined on first use.
+
+    comtypes builds the COM vtable from the interface class, which only exists
+    once the generated DeckLinkAPI wrapper has been loaded.
+    """
+    global _VideoOutputCallback
+    if _VideoOutputCallback is None:
+        class VideoOutputCallback(comtypes.COMObject):
+            _com_interfaces_ = [decklink_api.IDeckLinkVideoOutputCallback]
+
+            def __init__(self, frame_completed):
+                super().__init__()
+                self._frame_completed = frame_completed
+
+            def ScheduledFrameCompleted(self, completed_frame, result):
+                # DeckLink is done with the frame (shown, dropped or flushed), so it can be reused
+                try:
+                    if completed_frame:
+                        self._frame_completed(completed_frame)
+                except Exception as e:
+                    logging.error(f"Error in frame completion callback: {e}\n{traceback.format_exc()}")
+                return S_OK
+
+            def ScheduledPlaybackHasStopped(self):
+                return S_OK
+
+        _VideoOutputCallback = VideoOutputCallback
+    return _VideoOutputCallback
 
 class SDIOutput(QObject):
     error_occurred = pyqtSignal(str)
+    accepts_raw_frames = True # send_frame takes native UYVY/BGRA frames (only for the duration of the call)
     
     def __init__(self):
         super().__init__()
         self.decklink = None
         self.output = None
         self.is_running = False
+        self._video_output_enabled = False
+        self._scheduled_frames = 0
+        self.dropped_frames = 0 # Frames skipped because playback was too far behind
+        self._frames = [] # (DeckLink frame, numpy view of its buffer)
+        self._free_frames = deque() # Indices into _frames that DeckLink has handed back
+        self._frame_index_by_address = {} # Buffer address -> index into _frames
+        self._get_buffered_count = None # Bound output methods, set by start()
+        self._schedule_video_frame = None
+        self.callback = None
+        self._decklink_api = None # Generated comtypes DeckLinkAPI module
         try:
             comtypes.CoInitialize()
             logging.info("COM initialized in SDIOutput.")
+            self._decklink_api = ensure_decklink_module()
             self._initialize_decklink()
         except Exception as e:
             error_msg = f"SDIOutput initialization error: {e}\n{traceback.format_exc()}"
@@ -58,10 +99,10 @@ class SDIOutput(QObject):
         try:
             # Create DeckLink instance
             self.decklink = comtypes.CoCreateInstance(
-                DECKLINK_IID['IDeckLink'],
+                IID_IDeckLink,
                 None,
                 comtypes.CLSCTX_ALL,
-                DECKLINK_IID['IDeckLink']
+                IID_IDeckLink
             )
             logging.info("DeckLink instance created in SDIOutput.")
             
@@ -69,20 +110,21 @@ class SDIOutput(QObject):
                 raise RuntimeError("Failed to create DeckLink instance")
             
             # Get output interface
-            self.output = self.decklink.QueryInterface(DECKLINK_IID['IDeckLinkOutput'])
+            self.output = self.decklink.QueryInterface(IID_IDeckLinkOutput)
             logging.info("DeckLink output interface obtained in SDIOutput.")
             if not self.output:
                 raise RuntimeError("Failed to get output interface")
             
-            # Set video output mode
-            result = self.output.EnableVideoOutput(
-                DECKLINK_MODE['bmdModeHD1080p60'],
-                DECKLINK_MODE['bmdVideoOutputFlagDefault']
-            )
+            self._enable_video_output()
+            logging.info("Video output enabled in SDIOutput.")
             
+            # Frames are returned to the pool as DeckLink completes them
+            if self._decklink_api is None:
+                raise RuntimeError("DeckLinkAPI type library not loaded")
+            self.callback = _video_output_callback_class(self._decklink_api)(self._frame_completed)
+            result = self.output.SetScheduledFrameCompletionCallback(self.callback)
             if result != S_OK:
-                raise RuntimeError(f"Failed to enable video output: {result}")
-            logging.info("Video output enabled in SDIOutput.")
+                raise RuntimeError(f"Failed to set frame completion callback: {result}")
             
         except Exception as e:
             error_msg = f"DeckLink initialization in SDIOutput failed: {e}\n{traceback.format_exc()}"
@@ -90,6 +132,17 @@ class SDIOutput(QObject):
             self.error_occurred.emit(f"DeckLink init failed: {e}")
             self.output = None
     
+    def _enable_video_output(self):
+        """Set the video output mode"""
+        result = self.output.EnableVideoOutput(
+            bmdModeHD1080p60,
+            bmdVideoOutputFlagDefault
+        )
+        
+        if result != S_OK:
+            raise RuntimeError(f"Failed to enable video output: {result}")
+        self._video_output_enabled = True
+    
     def start(self):
         """Start SDI output"""
         if not self.output:
@@ -97,7 +150,19 @@ class SDIOutput(QObject):
             return False
             
         try:
-            result = self.output.StartScheduledPlayback(0, 100, 1.0) # Start immediately
+            # Like the NDI sender, playback follows the incoming frames: each frame is
+            # scheduled one frame duration after the previous one, on the output
+            # mode's own timeline (1000/60000 for bmdModeHD1080p60)
+            self._scheduled_frames = 0
+            self.dropped_frames = 0
+            if not self._video_output_enabled:
+                # stop() disabled it; frames can only be created on an enabled output
+                self._enable_video_output()
+            self._allocate_frames()
+            # Bound once: send_frame calls these for every frame
+            self._get_buffered_count = self.output.GetBufferedVideoFrameCount
+            self._schedule_video_frame = self.output.ScheduleVideoFrame
+            result = self.output.StartScheduledPlayback(0, DECKLINK_TIME_SCALE, 1.0) # Start immediately
             if result != S_OK:
                 raise RuntimeError(f"Failed to start scheduled playback: {result}")
                 
@@ -108,6 +173,39 @@ class SDIOutput(QObject):
             self.error_occurred.emit(str(e))
             return False
     
+    def _allocate_frames(self):
+        """Create the pool of DeckLink frames send_frame writes into, with numpy views of their buffers.
+
+        At most SDI_OUTPUT_MAX_BUFFERED_FRAMES are queued, plus the one on
+        screen, so the pool normally always has a free frame.
+        """
+        self._frames = []
+        self._free_frames.clear()
+        self._frame_index_by_address = {}
+        for index in range(SDI_OUTPUT_MAX_BUFFERED_FRAMES + 2):
+            video_frame = self.output.CreateVideoFrame(
+                DECKLINK_WIDTH,
+                DECKLINK_HEIGHT,
+                DECKLINK_ROW_BYTES, # line_stride_in_bytes (2 bytes per pixel for UYVY)
+                bmdFormat8BitYUV,
+                bmdFrameFlagDefault
+            )
+            if not video_frame:
+                raise RuntimeError("Failed to create video frame")
+            address = _frame_address(video_frame)
+            view = np.frombuffer(_FrameBuffer.from_address(address), dtype=np.uint8).reshape(DECKLINK_FRAME_SHAPE)
+            self._frames.append((video_frame, view))
+            self._frame_index_by_address[address] = index
+            self._free_frames.append(index)
+
+    def _frame_completed(self, video_frame):
+        """Return a completed frame to the pool (called on DeckLink's callback thread)"""
+        if not self.is_running:
+            return # Flushed by stop(); the pool is discarded
+        index = self._frame_index_by_address.get(_frame_address(video_frame))
+        if index is not None:
+            self._free_frames.append(index)
+    
     def stop(self):
         """Stop SDI output"""
         self.is_running = False
@@ -115,8 +213,13 @@ class SDIOutput(QObject):
             try:
                 self.output.StopScheduledPlayback(0)
                 self.output.DisableVideoOutput()
+                self._video_output_enabled = False
             except Exception as e:
                 self.error_occurred.emit(f"Error stopping output: {e}")
+        self._frames = []
+        self._free_frames.clear()
+        self._frame_index_by_address = {}
+        self._get_buffered_count = self._schedule_video_frame = None
     
     def send_frame(self, frame):
         """Send a frame through SDI output"""
@@ -124,31 +227,46 @@ class SDIOutput(QObject):
             return False
         
         try:
-            # Convert BGR to YUV (YUY2)
-            yuv_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_YUY2)
-            
-            # Allocate frame buffer
-            frame_buffer = ctypes.create_string_buffer(yuv_frame.tobytes())
+            # If the input runs faster than the output clock, scheduled frames pile
+            # up and latency grows; skip frames (before converting them) instead
+            if self._get_buffered_count() >= SDI_OUTPUT_MAX_BUFFERED_FRAMES:
+                self.dropped_frames += 1
+                return False
             
-            # Create video frame
-            video_frame = self.output.CreateVideoFrame(
-                DECKLINK_MODE['width'],
-                DECKLINK_MODE['height'],
-                DECKLINK_MODE['width'] * 2, # line_stride_in_bytes (2 bytes per pixel for YUY2)
-                DECKLINK_MODE['bmdFormat8BitYUV'],
-                DECKLINK_MODE['bmdFrameFlagDefault']
-            )
-            
-            if not video_frame:
-                raise RuntimeError("Failed to create video frame")
+            if frame.shape[:2] != DECKLINK_FRAME_SHAPE[:2]:
+                raise ValueError(f"Frame is {frame.shape[1]}x{frame.shape[0]}, output mode is {DECKLINK_WIDTH}x{DECKLINK_HEIGHT}")
             
-            # Copy data to frame buffer
-            ctypes.memmove(video_frame.GetBytes(), frame_buffer, len(frame_buffer))
+            # Write straight into a free DeckLink frame's buffer
+            try:
+                index = self._free_frames.popleft()
+            except IndexError:
+                self.dropped_frames += 1
+                return False
+            video_frame, view = self._frames[index]
+            try:
+                if frame.shape[2] == 2:
+                    # Already UYVY (matching bmdFormat8BitYUV)
+                    np.copyto(view, frame)
+                elif frame.shape[2] == 4:
+                    # BGRA, e.g. a borrowed view of an NDI receiver's buffer
+                    cv2.cvtColor(frame, cv2.COLOR_BGRA2YUV_UYVY, dst=view)
+                else:
+                    # Convert BGR to YUV (UYVY, matching bmdFormat8BitYUV)
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_UYVY, dst=view)
             
-            # Schedule frame for playback
-            result = self.output.ScheduleVideoFrame(video_frame, 0, 100, 1.0)
-            if result != S_OK:
-                raise RuntimeError(f"Failed to schedule video frame: {result}")
+                # Schedule frame for playback
+                result = self._schedule_video_frame(
+                    video_frame,
+                    self._scheduled_frames * DECKLINK_FRAME_DURATION,
+                    DECKLINK_FRAME_DURATION,
+                    DECKLINK_TIME_SCALE
+                )
+                if result != S_OK:
+                    raise RuntimeError(f"Failed to schedule video frame: {result}")
+            except Exception:
+                self._free_frames.append(index) # Never scheduled, so still ours
+                raise
+            self._scheduled_frames += 1
             
             return True
             
@@ -156,6 +274,15 @@ class SDIOutput(QObject):
             self.error_occurred.emit(f"Error sending SDI frame: {e}")
             return False
     
+    def send_frame_uyvy(self, uyvy):
+        """Send a UYVY frame (bmdFormat8BitYUV), copied into the DeckLink frame without conversion"""
+        if not self.is_running or uyvy is None:
+            return False
+        if uyvy.dtype != np.uint8 or uyvy.ndim != 3 or uyvy.shape[2] != 2:
+            self.error_occurred.emit(f"send_frame_uyvy needs uint8 UYVY frames, got {uyvy.dtype} {uyvy.shape}")
+            return False
+        return self.send_frame(uyvy)
+    
     def __del__(self):
         """Cleanup resources"""
         self.stop()
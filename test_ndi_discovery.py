@@ -1,5 +1,4 @@
 import sys
-import time
 import ctypes
 from ctypes import *
 import os
@@ -32,11 +31,18 @@ class NDIlib_source_t(Structure):
     ]
 
 # Define function signatures
+ndi_lib.NDIlib_initialize.argtypes = []
 ndi_lib.NDIlib_initialize.restype = c_bool
+ndi_lib.NDIlib_find_create2.argtypes = [POINTER(NDIlib_find_create_t)]
 ndi_lib.NDIlib_find_create2.restype = c_void_p
+ndi_lib.NDIlib_find_wait_for_sources.argtypes = [c_void_p, c_uint32]
+ndi_lib.NDIlib_find_wait_for_sources.restype = c_bool
+ndi_lib.NDIlib_find_get_current_sources.argtypes = [c_void_p, POINTER(c_uint32)]
 ndi_lib.NDIlib_find_get_current_sources.restype = POINTER(NDIlib_source_t)
-ndi_lib.NDIlib_find_get_current_sources.argtypes = [c_void_p, c_void_p]
 ndi_lib.NDIlib_find_destroy.argtypes = [c_void_p]
+ndi_lib.NDIlib_find_destroy.restype = None
+ndi_lib.NDIlib_destroy.argtypes = []
+ndi_lib.NDIlib_destroy.restype = None
 
 # Initialize NDI
 print("Initializing NDI...")
@@ -58,12 +64,15 @@ if not find_instance:
     sys.exit(1)
 print("NDI find instance created successfully")
 
-# Wait for sources to be discovered
+# Wait for sources to be discovered: returns as soon as the source list
+# changes, giving up after 5 s
 print("Waiting for sources to be discovered...")
-time.sleep(5)  # Give more time for discovery
+for _ in range(25):
+    if ndi_lib.NDIlib_find_wait_for_sources(find_instance, 200):
+        break
 
 # Get current sources
-num_sources = c_int(0)
+num_sources = c_uint32(0)
 sources = ndi_lib.NDIlib_find_get_current_sources(find_instance, byref(num_sources))
 
 print(f"\nFound {num_sources.value} NDI sources:")
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from src import color_convert, preview_kernels
+
+def _random_uyvy(height=64, width=96, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 2), dtype=np.uint8)
+
+def _reference_bgr(uyvy):
+    return cv2.cvtColor(uyvy, cv2.COLOR_YUV2BGR_UYVY)
+
+def _max_difference(a, b):
+    return int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+
+def test_uyvy_to_bgra_fallback_matches_opencv(monkeypatch):
+    monkeypatch.setattr(color_convert, "_simd", None)
+    uyvy = _random_uyvy()
+    bgra = color_convert.uyvy_to_bgra(uyvy)
+    assert bgra.shape == uyvy.shape[:2] + (4,)
+    assert _max_difference(bgra[..., :3], _reference_bgr(uyvy)) <= 1
+    assert (bgra[..., 3] == 255).all()
+
+@pytest.mark.skipif(not color_convert.HAVE_SIMD, reason="SIMD library not built")
+def test_uyvy_to_bgra_simd_matches_opencv():
+    uyvy = _random_uyvy(height=67, width=98) # Exercises the scalar tail too
+    bgra = color_convert.uyvy_to_bgra(uyvy, np.empty(uyvy.shape[:2] + (4,), np.uint8))
+    assert _max_difference(bgra[..., :3], _reference_bgr(uyvy)) <= 1
+    assert (bgra[..., 3] == 255).all()
+
+@pytest.mark.parametrize("step", [1, 2, 3])
+def test_preview_numpy_kernel_matches_opencv(step):
+    uyvy = _random_uyvy()
+    out_h, out_w = uyvy.shape[0] // step, uyvy.shape[1] // step
+    rgb = np.empty((out_h, out_w, 3), np.uint8)
+    preview_kernels._uyvy_to_rgb_downscale_numpy(uyvy, rgb, step)
+    expected = _reference_bgr(uyvy)[:out_h * step:step, :out_w * step:step, ::-1]
+    assert _max_difference(rgb, expected) <= 1
+
+@pytest.mark.skipif(not preview_kernels.HAVE_NUMBA, reason="Numba not installed")
+@pytest.mark.parametrize("step", [1, 2, 3])
+def test_preview_numba_kernel_matches_numpy(step):
+    uyvy = _random_uyvy()
+    out_h, out_w = uyvy.shape[0] // step, uyvy.shape[1] // step
+    expected = np.empty((out_h, out_w, 3), np.uint8)
+    preview_kernels._uyvy_to_rgb_downscale_numpy(uyvy, expected, step)
+    rgb = preview_kernels.uyvy_to_rgb_downscale(uyvy, np.empty_like(expected), step)
+    assert _max_difference(rgb, expected) <= 1
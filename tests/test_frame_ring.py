@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from src.frame_ring import FRAME_ALIGNMENT, FrameRing, aligned_empty
+
+@pytest.mark.parametrize("shape", [(1080, 1920, 2), (1080, 1920, 4), (7, 5, 3), (1,), (3, 1)])
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32, np.float64])
+def test_aligned_empty_is_aligned(shape, dtype):
+    array = aligned_empty(shape, dtype)
+    assert array.ctypes.data % FRAME_ALIGNMENT == 0
+    assert array.shape == shape
+    assert array.dtype == dtype
+    assert array.flags['C_CONTIGUOUS'] and array.flags['WRITEABLE']
+
+def test_aligned_empty_custom_alignment():
+    assert aligned_empty((10, 10), np.uint8, alignment=4096).ctypes.data % 4096 == 0
+
+def test_ring_reuses_slots_round_robin():
+    ring = FrameRing(3)
+    first = [ring.next((4, 4, 4)) for _ in range(3)]
+    second = [ring.next((4, 4, 4)) for _ in range(3)]
+    for a, b in zip(first, second):
+        assert a is b
+
+def test_ring_does_not_hand_out_a_slot_again_before_wrapping():
+    slots = 4
+    ring = FrameRing(slots)
+    buffers = [ring.next((8, 8, 2)) for _ in range(slots)]
+    addresses = {b.ctypes.data for b in buffers}
+    assert len(addresses) == slots
+    assert ring.next((8, 8, 2)) is buffers[0]
+
+def test_ring_buffers_are_aligned():
+    ring = FrameRing(2)
+    for _ in range(4):
+        assert ring.next((1080, 1920, 4)).ctypes.data % FRAME_ALIGNMENT == 0
+
+def test_ring_reallocates_on_geometry_change():
+    ring = FrameRing(1)
+    small = ring.next((4, 4, 4))
+    large = ring.next((8, 8, 4))
+    assert large is not small and large.shape == (8, 8, 4)
+    assert ring.next((8, 8, 4)) is large
+    assert ring.next((8, 8, 4), np.uint16).dtype == np.uint16
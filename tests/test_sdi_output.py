@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt6")
+pytest.importorskip("comtypes", exc_type=ImportError) # Raises ImportError off Windows
+
+from src import sdi_output
+from src.config import DECKLINK_FRAME_BYTES, DECKLINK_FRAME_SHAPE, DECKLINK_FRAME_DURATION, DECKLINK_TIME_SCALE
+
+class _FakeFrame:
+    def __init__(self):
+        self.buffer = np.zeros(DECKLINK_FRAME_BYTES, dtype=np.uint8)
+
+    def GetBytes(self):
+        return self.buffer.ctypes.data
+
+class _FakeOutput:
+    """The IDeckLinkOutput calls SDIOutput makes; like the driver, frames can only be created while output is enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.playing = False
+        self.scheduled = []
+
+    def EnableVideoOutput(self, mode, flags):
+        self.enabled = True
+        return sdi_output.S_OK
+
+    def DisableVideoOutput(self):
+        self.enabled = False
+        return sdi_output.S_OK
+
+    def CreateVideoFrame(self, width, height, row_bytes, pixel_format, flags):
+        if not self.enabled:
+            raise OSError("CreateVideoFrame: video output is not enabled")
+        return _FakeFrame()
+
+    def StartScheduledPlayback(self, start_time, time_scale, speed):
+        self.playing = True
+        return sdi_output.S_OK
+
+    def StopScheduledPlayback(self, stop_time):
+        self.playing = False
+        return sdi_output.S_OK
+
+    def GetBufferedVideoFrameCount(self):
+        return 0
+
+    def ScheduleVideoFrame(self, frame, display_time, duration, time_scale):
+        self.scheduled.append((display_time, duration, time_scale))
+        return sdi_output.S_OK
+
+@pytest.fixture
+def output(monkeypatch):
+    monkeypatch.setattr(sdi_output.SDIOutput, "_initialize_decklink", lambda self: None)
+    monkeypatch.setattr(sdi_output, "ensure_decklink_module", lambda: None)
+    monkeypatch.setattr(sdi_output.comtypes, "CoInitialize", lambda: None)
+    sdi = sdi_output.SDIOutput()
+    sdi.output = _FakeOutput()
+    sdi._enable_video_output() # What _initialize_decklink does
+    yield sdi
+    sdi.stop()
+    sdi.output = None # Nothing for __del__ to release
+
+def _frame():
+    return np.zeros(DECKLINK_FRAME_SHAPE, dtype=np.uint8)
+
+def test_start_stop_start(output):
+    assert output.start()
+    assert output.send_frame(_frame())
+    output.stop()
+    assert not output.output.enabled
+
+    assert output.start()
+    assert output.output.enabled
+    assert output.output.playing
+    assert output.send_frame(_frame())
+
+def test_frames_are_scheduled_on_the_output_mode_timeline(output):
+    assert output.start()
+    for _ in range(3):
+        assert output.send_frame(_frame())
+    assert output.output.scheduled == [
+        (i * DECKLINK_FRAME_DURATION, DECKLINK_FRAME_DURATION, DECKLINK_TIME_SCALE) for i in range(3)
+    ]
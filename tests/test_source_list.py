@@ -0,0 +1,91 @@
+import importlib
+import os
+import types
+
+import pytest
+
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+def _import(name, monkeypatch, tmp_path):
+    # The modules set up an app_errors.log file handler in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module(name)
+
+@pytest.fixture
+def ndi_input(monkeypatch, tmp_path):
+    module = _import("src.ndi_input", monkeypatch, tmp_path)
+    monkeypatch.setattr(module.NDIInput, "_sources_cache", (0.0, []))
+    return module
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+def test_list_sources_uses_cache_within_ttl(ndi_input, monkeypatch):
+    clock = _Clock()
+    rounds = []
+    def discover():
+        rounds.append(clock.now)
+        return [f"SOURCE {len(rounds)}"]
+    monkeypatch.setattr(ndi_input.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(ndi_input.NDIInput, "_discover_sources", staticmethod(discover))
+    ttl = ndi_input.NDI_SOURCES_CACHE_TTL
+
+    assert ndi_input.NDIInput.list_sources() == ["SOURCE 1"]
+    clock.now += ttl / 2
+    assert ndi_input.NDIInput.list_sources() == ["SOURCE 1"]
+    assert len(rounds) == 1
+
+    clock.now += ttl
+    assert ndi_input.NDIInput.list_sources() == ["SOURCE 2"]
+    assert len(rounds) == 2
+
+    assert ndi_input.NDIInput.list_sources(max_age=0) == ["SOURCE 3"]
+
+def test_list_sources_returns_a_copy(ndi_input, monkeypatch):
+    monkeypatch.setattr(ndi_input.NDIInput, "_discover_sources", staticmethod(lambda: ["A"]))
+    ndi_input.NDIInput.list_sources().append("B")
+    assert ndi_input.NDIInput.list_sources() == ["A"]
+
+@pytest.fixture
+def selector(monkeypatch, tmp_path):
+    from PyQt6.QtCore import QStringListModel
+    from PyQt6.QtWidgets import QApplication, QComboBox
+    main = _import("src.main", monkeypatch, tmp_path)
+    app = QApplication.instance() or QApplication([])
+    window = types.SimpleNamespace(_sources_model=QStringListModel(), ndi_source_selector=QComboBox())
+    window.ndi_source_selector.setModel(window._sources_model)
+    window.set_items = lambda items: main.MainWindow._set_source_items(window, items)
+    yield window
+    del app
+
+def test_set_source_items_keeps_selection_on_insert(selector):
+    selector.set_items(["A", "B", "C"])
+    selector.ndi_source_selector.setCurrentIndex(1)
+    selector.set_items(["X", "A", "B", "C"])
+    assert selector._sources_model.stringList() == ["X", "A", "B", "C"]
+    assert selector.ndi_source_selector.currentText() == "B"
+
+def test_set_source_items_keeps_selection_on_remove(selector):
+    selector.set_items(["A", "B", "C"])
+    selector.ndi_source_selector.setCurrentIndex(2)
+    selector.set_items(["B", "C"])
+    assert selector._sources_model.stringList() == ["B", "C"]
+    assert selector.ndi_source_selector.currentText() == "C"
+
+def test_set_source_items_keeps_selection_on_rename(selector):
+    selector.set_items(["A", "B", "C"])
+    selector.ndi_source_selector.setCurrentIndex(2)
+    selector.set_items(["A", "B (renamed)", "C"])
+    assert selector._sources_model.stringList() == ["A", "B (renamed)", "C"]
+    assert selector.ndi_source_selector.currentText() == "C"
+
+def test_set_source_items_falls_back_to_first_when_selection_disappears(selector):
+    selector.set_items(["A", "B", "C"])
+    selector.ndi_source_selector.setCurrentIndex(1)
+    selector.set_items(["A", "C"])
+    assert selector.ndi_source_selector.currentIndex() == 0